@@ -51,6 +51,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=settings.DB_ENGINE == "sqlite",
     )
 
     with context.begin_transaction():
@@ -77,8 +78,17 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Una DDL esperando un lock bloquea todas las escrituras detrás de ella
+            connection.exec_driver_sql(f"SET lock_timeout = '{settings.MIGRATION_LOCK_TIMEOUT}'")
+            connection.exec_driver_sql(f"SET statement_timeout = '{settings.MIGRATION_STATEMENT_TIMEOUT}'")
+            connection.commit()
+
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite: ALTER TABLE limitado, las operaciones se hacen recreando la tabla
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
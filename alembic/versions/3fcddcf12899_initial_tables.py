@@ -10,6 +10,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from app.core.migrations import create_index_concurrently
+
 
 # revision identifiers, used by Alembic.
 revision: str = '3fcddcf12899'
@@ -28,8 +30,8 @@ def upgrade() -> None:
     sa.Column('is_superuser', sa.Boolean(), nullable=True),
     sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
-    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    create_index_concurrently(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    create_index_concurrently(op.f('ix_users_id'), 'users', ['id'], unique=False)
     op.create_table('items',
     sa.Column('id', sa.Integer(), nullable=False),
     sa.Column('title', sa.String(), nullable=False),
@@ -38,8 +40,8 @@ def upgrade() -> None:
     sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
     sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_items_id'), 'items', ['id'], unique=False)
-    op.create_index(op.f('ix_items_title'), 'items', ['title'], unique=False)
+    create_index_concurrently(op.f('ix_items_id'), 'items', ['id'], unique=False)
+    create_index_concurrently(op.f('ix_items_title'), 'items', ['title'], unique=False)
     # ### end Alembic commands ###
 
 
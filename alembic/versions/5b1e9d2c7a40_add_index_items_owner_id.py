@@ -0,0 +1,29 @@
+"""Add index on items.owner_id
+
+Revision ID: 5b1e9d2c7a40
+Revises: acd4c0e8bbf8
+Create Date: 2026-10-19 10:12:04.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e9d2c7a40'
+down_revision: Union[str, None] = 'acd4c0e8bbf8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Todas las consultas de item_service filtran por owner_id
+    create_index_concurrently(op.f('ix_items_owner_id'), 'items', ['owner_id'], unique=False)
+
+
+def downgrade() -> None:
+    drop_index_concurrently(op.f('ix_items_owner_id'), table_name='items')
@@ -0,0 +1,35 @@
+"""Add item_count to users
+
+Revision ID: 7d2e91c4b8a3
+Revises: e3a8b5d04f17
+Create Date: 2026-10-19 16:41:27.305918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import add_column_backfilled
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e91c4b8a3'
+down_revision: Union[str, None] = 'e3a8b5d04f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Contador por usuario; el backfill usa ix_items_owner_id (una partición por usuario).
+    # Lo que cambie durante el backfill lo corrige app.tools.reconcile_counts
+    add_column_backfilled(
+        'users',
+        sa.Column('item_count', sa.Integer(), server_default='0', nullable=False),
+        backfill_sql='(SELECT count(*) FROM items WHERE items.owner_id = users.id)',
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('item_count')
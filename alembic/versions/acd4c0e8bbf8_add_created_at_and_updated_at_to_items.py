@@ -10,6 +10,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from app.core.migrations import add_column_backfilled
+
 
 # revision identifiers, used by Alembic.
 revision: str = 'acd4c0e8bbf8'
@@ -20,13 +22,14 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('items', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
-    op.add_column('items', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    add_column_backfilled('items', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+    add_column_backfilled('items', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_column('items', 'updated_at')
-    op.drop_column('items', 'created_at')
+    with op.batch_alter_table('items') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('created_at')
     # ### end Alembic commands ###
@@ -0,0 +1,65 @@
+"""Add stats rollup tables and index on items.created_at
+
+Revision ID: b6f04d9a3e21
+Revises: 7d2e91c4b8a3
+Create Date: 2026-10-19 17:58:12.640355
+
+Los rollups se rellenan con:
+
+    python -m app.tools.refresh_stats
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core import partitioning
+from app.core.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f04d9a3e21'
+down_revision: Union[str, None] = '7d2e91c4b8a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stats_items_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('items_created', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('stats_user_items',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_stats_user_items_item_count'), 'stats_user_items', ['item_count'], unique=False)
+    op.create_table('stats_watermarks',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    # Rango de created_at para el refresco incremental
+    create_index_concurrently(op.f('ix_items_created_at'), 'items', ['created_at'], unique=False)
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and partitioning.has_shadow_table(bind):
+        # Copia a la tabla particionada aún en curso: el swap renombra este índice
+        create_index_concurrently(
+            f'ix_{partitioning.SHADOW}_created_at', partitioning.SHADOW, ['created_at'], unique=False
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and partitioning.has_shadow_table(bind):
+        drop_index_concurrently(f'ix_{partitioning.SHADOW}_created_at', table_name=partitioning.SHADOW)
+    drop_index_concurrently(op.f('ix_items_created_at'), table_name='items')
+    op.drop_table('stats_watermarks')
+    op.drop_index(op.f('ix_stats_user_items_item_count'), table_name='stats_user_items')
+    op.drop_table('stats_user_items')
+    op.drop_table('stats_items_daily')
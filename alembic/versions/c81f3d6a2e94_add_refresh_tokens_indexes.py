@@ -0,0 +1,31 @@
+"""Add indexes on refresh_tokens.user_id and expires_at
+
+Revision ID: c81f3d6a2e94
+Revises: 4a9c2e7f1d58
+Create Date: 2026-10-19 21:05:37.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f3d6a2e94'
+down_revision: Union[str, None] = '4a9c2e7f1d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # revoke_user_tokens filtra por user_id; la purga de caducados por expires_at
+    create_index_concurrently(op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id'], unique=False)
+    create_index_concurrently(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    drop_index_concurrently(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
+    drop_index_concurrently(op.f('ix_refresh_tokens_user_id'), table_name='refresh_tokens')
@@ -0,0 +1,56 @@
+"""Partition items by hash of owner_id
+
+Revision ID: e3a8b5d04f17
+Revises: 9c4f7a1e2b6d
+Create Date: 2026-10-19 12:26:41.330587
+
+Crea items_partitioned (ITEMS_PARTITIONS particiones) y el trigger que la
+mantiene sincronizada. Si items está vacía el swap se hace aquí mismo; si
+no, la copia y el swap se hacen online con:
+
+    python -m app.tools.partition_items
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core import partitioning
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a8b5d04f17'
+down_revision: Union[str, None] = '9c4f7a1e2b6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.online")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or settings.ITEMS_PARTITIONS <= 1:
+        return
+    if partitioning.is_partitioned(bind):
+        return
+
+    partitioning.create_shadow_table(bind, settings.ITEMS_PARTITIONS)
+
+    if not bind.execute(sa.text("SELECT EXISTS (SELECT 1 FROM items)")).scalar():
+        partitioning.swap(bind, settings.MIGRATION_LOCK_TIMEOUT)
+    else:
+        logger.info("items has rows: run `python -m app.tools.partition_items` to copy and swap online")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    if partitioning.is_partitioned(bind):
+        raise RuntimeError(
+            "items is already partitioned; restore items_unpartitioned manually before downgrading"
+        )
+    partitioning.drop_shadow_table(bind)
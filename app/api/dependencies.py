@@ -3,7 +3,10 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.security import decode_access_token
+from app.core.metrics import metrics
+from app.core.revocation import revocations
+from app.core.security import decode_access_token_claims
+from app.core.tracing import span
 from app.models.user import User
 
 
@@ -27,31 +30,60 @@ def get_current_user(
     Raises:
         HTTPException 401 si el token es inválido o el usuario no existe
     """
+    with span("get_current_user"):
+        return _authenticate(credentials.credentials, db)
+
+
+def _authenticate(token: str, db: Session) -> User:
     credentials_exception = HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,
     detail="Could not validate credentials",
     headers={"WWW-Authenticate": "Bearer"},
     )
     
-    # Extraer token del header Authorization: Bearer <token>
-    token = credentials.credentials
-    
-    # decode_access_token devuelve el email directamente o None
-    email = decode_access_token(token)
+    with span("jwt.decode"):
+        claims = decode_access_token_claims(token)
     
+    email = claims.get("sub") if claims else None
     if email is None:
         raise credentials_exception
     
+    # Revocación en memoria: O(1), sin consulta a la BD
+    revocations.ensure_started(db)
+    if revocations.is_token_revoked(claims.get("jti")):
+        metrics.inc("token_revocation_rejected_total", kind="jti")
+        raise credentials_exception
+    
     # Buscar usuario en BD
-    user = db.query(User).filter(User.email == email).first()
+    with span("user.lookup"):
+        user = db.query(User).filter(User.email == email).first()
     
     if user is None:
         raise credentials_exception
     
+    # Tokens sin iat (anteriores a la revocación por usuario) cuentan como emitidos en 0
+    if revocations.is_user_revoked(user.id, claims.get("iat", 0)):
+        metrics.inc("token_revocation_rejected_total", kind="user")
+        raise credentials_exception
+    
     if user.is_active is False:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
     
-    return user
\ No newline at end of file
+    return user
+
+def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Dependency para endpoints de administración.
+
+    Raises:
+        HTTPException 403 si el usuario autenticado no es superusuario
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough privileges"
+        )
+    return current_user
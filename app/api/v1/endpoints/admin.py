@@ -0,0 +1,73 @@
+# app/api/v1/endpoints/admin.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_superuser
+from app.core.database import get_db, release_connection
+from app.models.user import User
+from app.schemas.stats import ItemsPerDayResponse, TopUsersResponse
+from app.services.stats_service import get_items_per_day, get_top_users, get_watermark
+from app.services.token_service import revoke_user_tokens
+
+router = APIRouter()
+
+
+@router.get("/stats/items-per-day", response_model=ItemsPerDayResponse)
+def items_per_day(
+    days: int = Query(30, ge=1, le=3660),
+    current_user: User = Depends(get_current_superuser),
+    db: Session = Depends(get_db)
+):
+    """
+    Ítems creados por día.
+
+    Se sirve desde el rollup stats_items_daily (nunca lee ``items``); los
+    datos llegan hasta ``as_of`` (ver app.tools.refresh_stats).
+    """
+    as_of = get_watermark(db)
+    stats = get_items_per_day(db, days=days)
+    release_connection(db)
+    return {"as_of": as_of, "days": stats}
+
+
+@router.get("/stats/top-users", response_model=TopUsersResponse)
+def top_users(
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_superuser),
+    db: Session = Depends(get_db)
+):
+    """
+    Usuarios con más ítems.
+
+    Se sirve desde el rollup stats_user_items (nunca lee ``items``).
+    """
+    as_of = get_watermark(db)
+    users = get_top_users(db, limit=limit)
+    release_connection(db)
+    return {
+        "as_of": as_of,
+        "users": [
+            {"user_id": user_id, "email": email, "item_count": item_count}
+            for user_id, email, item_count in users
+        ],
+    }
+
+
+@router.post("/users/{user_id}/revoke-tokens", status_code=status.HTTP_204_NO_CONTENT)
+def revoke_tokens(
+    user_id: int,
+    current_user: User = Depends(get_current_superuser),
+    db: Session = Depends(get_db)
+):
+    """
+    Revoca todas las sesiones de un usuario (p.ej. cuenta comprometida).
+
+    Invalida los access tokens emitidos hasta ahora y todos sus refresh
+    tokens; el usuario tendrá que volver a hacer login.
+    """
+    if db.get(User, user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    revoke_user_tokens(db, user_id)
@@ -1,13 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
+from app.api.dependencies import get_current_user, security
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, hash_password
+from app.core.security import (
+    verify_and_update_password,
+    create_access_token,
+    decode_access_token_claims,
+    hash_password,
+)
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse
-from app.schemas.token import Token
+from app.schemas.token import Token, RefreshRequest
+from app.services.token_service import (
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
+    revoke_access_token,
+)
 
 router = APIRouter()
 
@@ -40,8 +54,7 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    db.commit()  # expire_on_commit=False: new_user conserva sus datos sin otro SELECT
 
     return new_user
 
@@ -55,12 +68,16 @@ def login_user(user_data: UserCreate, db: Session = Depends(get_db)):
     
     Returns:
         access_token: JWT válido por 30 minutos
+        refresh_token: Token opaco para renovar el access token sin password
         token_type: "bearer"
     """
     # Buscar usuario por email y verificar password
     user = db.query(User).filter(User.email == user_data.email).first()
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = verify_and_update_password(user_data.password, str(user.hashed_password))
 
-    if not user or not verify_password(user_data.password, str(user.hashed_password)):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -80,5 +97,89 @@ def login_user(user_data: UserCreate, db: Session = Depends(get_db)):
         data={"sub": user.email}, 
         expires_delta=access_token_expires
     )
+
+    # Rehash transparente si la política de coste ha cambiado (BCRYPT_ROUNDS)
+    if new_hash is not None:
+        user.hashed_password = new_hash
+
+    # Crear refresh token (nueva familia por cada login)
+    refresh_token = issue_refresh_token(db, user.id)
+    db.commit()
     
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(refresh_data: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Renueva el access token con un refresh token, sin verificar el password.
+
+    - **refresh_token**: Token obtenido en /login o en el último /refresh
+
+    El refresh token se rota en cada uso: el anterior deja de ser válido.
+    Reutilizar un token ya rotado revoca toda la sesión (familia).
+
+    Returns:
+        access_token: JWT nuevo
+        refresh_token: Refresh token nuevo
+        token_type: "bearer"
+    """
+    rotated = rotate_refresh_token(db, refresh_data.refresh_token)
+
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user, refresh_token = rotated
+    if user.is_active is False:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+
+    access_token = create_access_token(
+        data={"sub": user.email}, 
+        expires_delta=timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@router.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
+def revoke_token(refresh_data: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Revoca un refresh token y todas sus rotaciones (cierra la sesión del dispositivo).
+
+    Siempre responde 204, exista o no el token.
+    """
+    revoke_refresh_token(db, refresh_data.refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    refresh_data: Optional[RefreshRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Cierra la sesión: revoca el access token usado en la petición.
+
+    - **refresh_token** (opcional): si se envía, se revoca también su familia
+
+    El token deja de aceptarse al instante en este worker y en los demás
+    tras TOKEN_REVOCATION_SYNC_SECONDS como máximo.
+    """
+    # get_current_user ya ha validado el token
+    claims = decode_access_token_claims(credentials.credentials)
+    # Los tokens emitidos antes de existir jti caducan solos (JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    if claims.get("jti"):
+        revoke_access_token(
+            db,
+            jti=claims["jti"],
+            user_id=current_user.id,
+            expires_at=datetime.fromtimestamp(claims["exp"], timezone.utc)
+        )
+
+    if refresh_data is not None:
+        revoke_refresh_token(db, refresh_data.refresh_token)
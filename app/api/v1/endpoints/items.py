@@ -1,9 +1,13 @@
 # app/api/endpoints/items.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_current_user
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, release_connection
+from app.core.singleflight import item_reads
+from app.core.tracing import span
 from app.models.item import Item
 from app.schemas.user import UserResponse
 from app.schemas.item import ItemCreate, ItemUpdate, ItemRead
@@ -18,6 +22,20 @@ from app.services.item_service import (
 # Usar prefix y tags para mejor organización
 router = APIRouter()
 
+
+def _item_exists(db: Session, item_id: int) -> bool:
+    """
+    Comprueba si existe un ítem de cualquier usuario.
+
+    Sin owner_id no hay poda de particiones: solo se usa en la rama de
+    error para distinguir 404 de 403.
+    """
+    return db.query(Item.id).filter(Item.id == item_id).first() is not None
+
+
+# Serializa la lista completa de una vez (sin pasar por jsonable_encoder)
+item_list_adapter = TypeAdapter(list[ItemRead])
+
 @router.post("/", response_model=ItemRead, status_code=status.HTTP_201_CREATED)
 def create_item_endpoint(
     item: ItemCreate,
@@ -32,6 +50,7 @@ def create_item_endpoint(
         item_create=item, 
         owner_id=current_user.id
     )
+    item_reads.invalidate(current_user.id)
     return db_item
 
 
@@ -48,14 +67,37 @@ def read_user_items(
     Parámetros de consulta:
     - skip: Número de items a saltar (paginación)
     - limit: Máximo número de items a retornar
+
+    Las peticiones idénticas concurrentes del mismo usuario comparten una
+    sola consulta y su respuesta serializada (ver app/core/singleflight.py).
+
+    El total de ítems va en la cabecera ``X-Total-Count`` (users.item_count,
+    ya cargado al autenticar: sin COUNT(*) por petición).
     """
-    items = get_user_items(
-        db=db, 
-        owner_id=current_user.id, 
-        skip=skip, 
-        limit=limit
+    def load() -> bytes:
+        items = get_user_items(
+            db=db, 
+            owner_id=current_user.id, 
+            skip=skip, 
+            limit=limit
+        )
+        release_connection(db)  # la serialización no necesita la conexión
+        with span("response.serialize"):
+            return item_list_adapter.dump_json(
+                item_list_adapter.validate_python(items, from_attributes=True)
+            )
+
+    if settings.SINGLEFLIGHT_ENABLED:
+        body = item_reads.do(current_user.id, "items.list", (skip, limit), load)
+    else:
+        body = load()
+    # Quien esperó a otra ejecución aún tiene la conexión de get_current_user
+    release_connection(db)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"X-Total-Count": str(current_user.item_count)},
     )
-    return items
 
 
 @router.get("/{item_id}", response_model=ItemRead)
@@ -74,6 +116,7 @@ def read_item(
         item_id=item_id, 
         owner_id=current_user.id
     )
+    release_connection(db)
     if not db_item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -94,20 +137,7 @@ def update_item_endpoint(
     
     Solo actualiza los campos proporcionados en la solicitud.
     """
-    # 1. Buscar el item (sin verificar owner todavía)
-    item = db.query(Item).filter(Item.id == item_id).first()
-    
-    # 2. Validaciones detalladas
-    if not item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Item no encontrado"
-        )
-    
-    if item.owner_id is not current_user.id:
-        raise HTTPException(status_code=403, detail="No tienes permiso")
-    
-    # 3. Llamar al servicio (ahora sin verificación de owner)
+    # 1. Actualizar filtrando por owner (la consulta usa una sola partición)
     updated_item = update_item(
         db=db, 
         item_id=item_id,
@@ -115,6 +145,17 @@ def update_item_endpoint(
         item_update=item_update
     )
     
+    # 2. Validaciones detalladas, solo si no se encontró (404 vs 403)
+    if not updated_item:
+        if not _item_exists(db, item_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Item no encontrado"
+            )
+        raise HTTPException(status_code=403, detail="No tienes permiso")
+    
+    item_reads.invalidate(current_user.id)
+    
     return updated_item
 
 
@@ -128,21 +169,21 @@ def delete_item_endpoint(
     """
     Elimina un ítem.
     """
-    item = db.query(Item).filter(Item.id == item_id).first()
-    
-    if not item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Item no encontrado"
-        )
+    # Borrar filtrando por owner (la consulta usa una sola partición)
+    deleted = delete_item(db=db, item_id=item_id, owner_id=current_user.id)
     
-    if item.owner_id is not current_user.id:
+    # Validaciones detalladas, solo si no se borró (404 vs 403)
+    if not deleted:
+        if not _item_exists(db, item_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Item no encontrado"
+            )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permiso para eliminar este item"
         )
     
-    # Llamar al servicio modificado
-    delete_item(db=db, item_id=item_id, owner_id=current_user.id)
+    item_reads.invalidate(current_user.id)
     
     # No return para status 204
\ No newline at end of file
@@ -1,13 +1,18 @@
 from fastapi import Depends, APIRouter
+from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_current_user
+from app.core.database import get_db, release_connection
 from app.models.user import User
 from app.schemas.user import UserResponse
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
-def read_current_user(current_user: User = Depends(get_current_user)):
+def read_current_user(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """
     Obtiene la información del usuario autenticado.
     
@@ -16,4 +21,5 @@ def read_current_user(current_user: User = Depends(get_current_user)):
     Returns:
         Datos del usuario (id, email, is_active, is_superuser)
     """
+    release_connection(db)  # misma sesión que get_current_user
     return current_user
\ No newline at end of file
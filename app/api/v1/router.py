@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, items
+from app.api.v1.endpoints import admin, auth, users, items
 
 api_router = APIRouter()
 
@@ -8,6 +8,7 @@ api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["Users"])
 api_router.include_router(items.router, prefix="/items", tags=["Items"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
 
 @api_router.get("/ping")
 async def ping():
@@ -0,0 +1,183 @@
+"""
+Compresión de respuestas negociada por Accept-Encoding (zstd, br, gzip).
+
+- Solo respuestas completas (un único mensaje de cuerpo) de tipos de texto
+  y mayores de COMPRESSION_MIN_SIZE; las respuestas en streaming y las rutas
+  de COMPRESSION_EXCLUDE_PATHS pasan sin tocar
+- Por encima de COMPRESSION_THREADPOOL_MIN_SIZE se comprime en el threadpool
+  para no bloquear el event loop
+- Las rutas de COMPRESSION_CACHE_PATHS (p.ej. /openapi.json) se comprimen
+  una vez, al nivel máximo, y se reutilizan mientras el cuerpo no cambie
+
+brotli y zstandard son opcionales: si no están instalados no se ofrecen.
+"""
+import gzip
+import time
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+import anyio.to_thread
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+metrics.describe("compression_bytes_in_total", "Bytes antes de comprimir")
+metrics.describe("compression_bytes_out_total", "Bytes después de comprimir")
+metrics.describe("compression_cpu_seconds_total", "Tiempo de CPU comprimiendo")
+metrics.describe("compression_cache_hits_total", "Respuestas servidas desde la caché de precomprimidos")
+metrics.describe("compression_ratio", "bytes_in / bytes_out por codificación")
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml")
+
+
+def _encoders(static: bool) -> Dict[str, Callable[[bytes], bytes]]:
+    """Compresores disponibles en orden de preferencia; ``static`` usa el nivel máximo"""
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        zstd_level = 19 if static else settings.COMPRESSION_ZSTD_LEVEL
+        # ZstdCompressor no es thread-safe: uno por llamada
+        encoders["zstd"] = lambda data: zstandard.ZstdCompressor(level=zstd_level).compress(data)
+    if brotli is not None:
+        quality = 11 if static else settings.COMPRESSION_BROTLI_QUALITY
+        encoders["br"] = lambda data: brotli.compress(data, quality=quality)
+    level = 9 if static else settings.COMPRESSION_GZIP_LEVEL
+    encoders["gzip"] = lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+    return encoders
+
+
+def negotiate(accept_encoding: str, available) -> Optional[str]:
+    """
+    Elige la codificación con mayor q aceptada por el cliente.
+
+    A igual q gana el orden de ``available`` (zstd > br > gzip).
+
+    Returns:
+        Nombre de la codificación o None para responder sin comprimir
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _compress(encoder: Callable[[bytes], bytes], encoding: str, body: bytes) -> bytes:
+    started = time.thread_time()
+    compressed = encoder(body)
+    metrics.inc("compression_cpu_seconds_total", time.thread_time() - started, encoding=encoding)
+    return compressed
+
+
+def _collect_ratio(registry) -> None:
+    for labels, bytes_in in registry.series("compression_bytes_in_total").items():
+        bytes_out = registry.get("compression_bytes_out_total", **dict(labels))
+        registry.set("compression_ratio", bytes_in / bytes_out if bytes_out else 0.0, **dict(labels))
+
+
+metrics.add_collector(_collect_ratio)
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compresión (ver docstring del módulo)"""
+
+    def __init__(self, app):
+        self.app = app
+        self.dynamic = _encoders(static=False)
+        self.static = _encoders(static=True)
+        # (ruta, codificación) -> (crc32 del cuerpo original, cuerpo comprimido)
+        self.cache: Dict[Tuple[str, str], Tuple[int, bytes]] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(tuple(settings.COMPRESSION_EXCLUDE_PATHS)):
+            return await self.app(scope, receive, send)
+
+        accept = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        encoding = negotiate(accept, self.dynamic)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                return await send(message)
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            headers = dict(start_message.get("headers", []))
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            if (
+                message.get("more_body", False)            # streaming: no se bufferiza
+                or b"content-encoding" in headers
+                or len(body) < settings.COMPRESSION_MIN_SIZE
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start_message)
+                return await send(message)
+
+            compressed = await self._compress(scope["path"], encoding, body)
+            metrics.inc("compression_bytes_in_total", len(body), encoding=encoding)
+            metrics.inc("compression_bytes_out_total", len(compressed), encoding=encoding)
+
+            vary = headers.get(b"vary")
+            new_headers = [
+                (k, v) for k, v in start_message.get("headers", [])
+                if k not in (b"content-length", b"vary")
+            ]
+            new_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            await send({**start_message, "headers": new_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
+
+    async def _compress(self, path: str, encoding: str, body: bytes) -> bytes:
+        if path in settings.COMPRESSION_CACHE_PATHS:
+            checksum = zlib.crc32(body)
+            cached = self.cache.get((path, encoding))
+            if cached is not None and cached[0] == checksum:
+                metrics.inc("compression_cache_hits_total", encoding=encoding)
+                return cached[1]
+            compressed = await anyio.to_thread.run_sync(_compress, self.static[encoding], encoding, body)
+            self.cache[(path, encoding)] = (checksum, compressed)
+            return compressed
+
+        if len(body) >= settings.COMPRESSION_THREADPOOL_MIN_SIZE:
+            return await anyio.to_thread.run_sync(_compress, self.dynamic[encoding], encoding, body)
+        return _compress(self.dynamic[encoding], encoding, body)
@@ -7,6 +7,9 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     API_PREFIX: str = "/api/v1"
 
+    # DB engine: "postgresql" (servidor) o "sqlite" (embebido, home hubs)
+    DB_ENGINE: str = "postgresql"
+
     # DB settings (PostgreSQL)
     DB_HOST: str = "localhost"
     DB_PORT: int = 5432
@@ -14,10 +17,75 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = "securepassword"
     DB_NAME: str = "homebrain_db"
 
+    # Pool de conexiones, por worker (dimensionar con: python -m app.tools.bench_pool)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # segundos esperando conexión libre antes de fallar
+    DB_POOL_RECYCLE: int = 1800  # < idle timeout del servidor/proxy (-1 desactiva)
+    DB_POOL_PRE_PING: bool = False  # SELECT 1 en cada checkout; solo como último recurso
+    DB_POOL_LIVENESS_SECONDS: float = 30.0  # comprobación en segundo plano; 0 desactiva
+
+    # DB settings (SQLite, ver app/core/sqlite.py)
+    SQLITE_PATH: str = "homebrain.db"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # seguro con WAL; FULL si se prefiere durabilidad
+    SQLITE_MMAP_SIZE: int = 64 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 8 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Password hashing (calibrar con: python -m app.tools.calibrate_hash)
+    BCRYPT_ROUNDS: int = 12
+
     # Security JWT
     JWT_SECRET_KEY: str = "your-secret-key-change-in-production-min-32-chars"
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REFRESH_TOKEN_HASH_KEY: str = ""  # vacío = JWT_SECRET_KEY
+
+    # Revocación de access tokens (ver app/core/revocation.py)
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 2.0  # retraso máximo entre workers
+    TOKEN_REVOCATION_OVERLAP_SECONDS: int = 60
+
+    # Particionado de items por HASH(owner_id); <= 1 desactiva (ver app/core/partitioning.py)
+    ITEMS_PARTITIONS: int = 16
+
+    # Online migrations (tablas grandes, ver app/core/migrations.py)
+    MIGRATION_LOCK_TIMEOUT: str = "5s"
+    MIGRATION_STATEMENT_TIMEOUT: str = "60s"
+    MIGRATION_BACKFILL_BATCH_SIZE: int = 10_000
+    MIGRATION_BACKFILL_PAUSE_SECONDS: float = 0.1
+
+    # Single-flight: lecturas idénticas concurrentes comparten una consulta
+    SINGLEFLIGHT_ENABLED: bool = True
+
+    # Profiling bajo demanda (ver app/core/profiling.py)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: str = ""  # vacío = solo superusuarios
+    PROFILING_DIR: str = "profiles"
+    PROFILING_SAMPLE_EVERY: int = 0  # 0 = sin muestreo automático
+    PROFILING_MAX_DISK_MB: int = 100
+
+    # Tracing en proceso con tail sampling (ver app/core/tracing.py)
+    TRACING_ENABLED: bool = False
+    TRACING_SLOW_MS: float = 500.0
+    TRACING_SAMPLE_RATE: float = 0.0  # fracción de trazas normales que también se guardan
+    TRACING_FILE: str = "traces/traces.otlp.jsonl"
+    TRACING_MAX_BYTES: int = 50 * 1024 * 1024
+    TRACING_BACKUP_COUNT: int = 5
+    TRACING_QUEUE_SIZE: int = 1000
+
+    # Compresión de respuestas (ver app/core/compression.py)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_THREADPOOL_MIN_SIZE: int = 64 * 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_EXCLUDE_PATHS: list[str] = []  # p.ej. endpoints en streaming
+    COMPRESSION_CACHE_PATHS: list[str] = ["/openapi.json"]
+
+    # Rollups de /admin/stats (ver app/services/stats_service.py)
+    STATS_REFRESH_LAG_SECONDS: int = 300  # > transacción de escritura más larga
 
     # CORS settings (for future frontend integration)
     BACKEND_CORS_ORIGINS: list[str] = ["http://localhost:3000"]
@@ -29,6 +97,8 @@ class Settings(BaseSettings):
     @property
     def DATABASE_URL(self) -> str:
         """Construye la URL de base de datos dinámicamente"""
+        if self.DB_ENGINE == "sqlite":
+            return f"sqlite:///{self.SQLITE_PATH}"
         return f"postgresql+psycopg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
     # class Config:
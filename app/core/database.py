@@ -1,19 +1,35 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.core.sqlite import configure_sqlite
 
 # Create engine (connection pool)
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True, # To check if connections are alive
-    echo=settings.DEBUG # Log SQL queries in debug mode
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    # Sin SELECT 1 por checkout: las conexiones caídas las detecta el
+    # PoolLivenessChecker o el propio error (ver app/core/pool.py)
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    echo=settings.DEBUG, # Log SQL queries in debug mode
+    # SQLite: las sesiones se usan desde varios hilos del threadpool
+    connect_args={"check_same_thread": False} if settings.DB_ENGINE == "sqlite" else {},
 )
 
+if settings.DB_ENGINE == "sqlite":
+    configure_sqlite(engine)
+
 # SessionLocal: a factory for new Session objects
+# La Session no toma conexión del pool hasta la primera consulta y la
+# devuelve en cada commit; expire_on_commit=False evita que serializar un
+# objeto recién guardado vuelva a pedir una conexión para recargarlo
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,
     bind=engine
 )
 
@@ -26,4 +42,18 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def release_connection(db: Session) -> None:
+    """
+    Devuelve la conexión al pool antes de serializar la respuesta.
+
+    Cierra la transacción de lectura; los objetos ya cargados se quedan
+    accesibles (desligados de la sesión), y si después se vuelve a consultar
+    la sesión toma otra conexión.
+
+    Args:
+        db: Sesión de la petición
+    """
+    db.close()
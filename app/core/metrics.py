@@ -0,0 +1,83 @@
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Metrics:
+    """
+    Registro en memoria de contadores y gauges, por proceso.
+
+    Se expone en formato de texto de Prometheus desde ``GET /metrics``.
+    Los gauges que dependen de otros valores se calculan en el momento de
+    renderizar mediante collectors registrados con ``add_collector``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelSet, float]] = defaultdict(lambda: defaultdict(float))
+        self._gauges: Dict[str, Dict[LabelSet, float]] = defaultdict(dict)
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[["Metrics"], None]] = []
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> LabelSet:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Registra el texto de ayuda (# HELP) de una métrica"""
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        """Incrementa un contador"""
+        with self._lock:
+            self._counters[name][self._labels(labels)] += value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Fija el valor de un gauge"""
+        with self._lock:
+            self._gauges[name][self._labels(labels)] = value
+
+    def get(self, name: str, **labels) -> float:
+        """Valor actual de un contador o gauge (0 si no existe)"""
+        key = self._labels(labels)
+        with self._lock:
+            if name in self._counters:
+                return self._counters[name].get(key, 0.0)
+            return self._gauges.get(name, {}).get(key, 0.0)
+
+    def series(self, name: str) -> Dict[LabelSet, float]:
+        """Copia de todos los valores de una métrica, por conjunto de labels"""
+        with self._lock:
+            return dict(self._counters.get(name) or self._gauges.get(name) or {})
+
+    def add_collector(self, collector: Callable[["Metrics"], None]) -> None:
+        """Registra una función que actualiza gauges justo antes de renderizar"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Serializa todas las métricas en formato de texto de Prometheus.
+
+        Returns:
+            Texto listo para servir con media type text/plain
+        """
+        for collector in self._collectors:
+            collector(self)
+
+        lines: List[str] = []
+        with self._lock:
+            for kind, series in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(series):
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for labels, value in sorted(series[name].items()):
+                        label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                        lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Instancia global (una por worker)
+metrics = Metrics()
@@ -0,0 +1,323 @@
+"""
+Helpers para migraciones online (sin bloquear escrituras) en tablas grandes.
+
+Se usan desde las revisiones de Alembic en lugar de ``op.create_index`` y
+``op.add_column`` cuando la tabla puede tener millones de filas:
+
+- ``create_index_concurrently``: CREATE INDEX CONCURRENTLY fuera de la
+  transacción de la migración, informando del progreso (en tablas
+  particionadas, partición a partición)
+- ``add_column_backfilled``: añade la columna como nullable (instantáneo),
+  la rellena en lotes con pausas y después aplica NOT NULL validando con un
+  CHECK ... NOT VALID para no mantener ACCESS EXCLUSIVE durante el escaneo
+- ``timeouts``: fija ``lock_timeout``/``statement_timeout`` para que una DDL
+  que espera un lock falle rápido en vez de encolar todas las escrituras
+
+En dialectos distintos de PostgreSQL se degradan a las operaciones normales.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core.config import settings
+
+logger = logging.getLogger("alembic.online")
+
+PROGRESS_INTERVAL_SECONDS = 10.0
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+@contextmanager
+def timeouts(
+    lock_timeout: Optional[str] = None,
+    statement_timeout: Optional[str] = None,
+) -> Iterator[None]:
+    """
+    Fija lock_timeout/statement_timeout durante el bloque y los restaura después.
+
+    Args:
+        lock_timeout: p.ej. "5s" (default: MIGRATION_LOCK_TIMEOUT)
+        statement_timeout: p.ej. "60s", "0" desactiva (default: MIGRATION_STATEMENT_TIMEOUT)
+    """
+    if not _is_postgresql():
+        yield
+        return
+
+    bind = op.get_bind()
+    previous = {
+        name: bind.exec_driver_sql(f"SHOW {name}").scalar()
+        for name in ("lock_timeout", "statement_timeout")
+    }
+    bind.exec_driver_sql(f"SET lock_timeout = '{lock_timeout or settings.MIGRATION_LOCK_TIMEOUT}'")
+    bind.exec_driver_sql(
+        f"SET statement_timeout = '{statement_timeout or settings.MIGRATION_STATEMENT_TIMEOUT}'"
+    )
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            bind.exec_driver_sql(f"SET {name} = '{value}'")
+
+
+class _IndexProgress(threading.Thread):
+    """Consulta pg_stat_progress_create_index desde otra conexión y lo registra"""
+
+    def __init__(self, engine: sa.engine.Engine, index_name: str):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.index_name = index_name
+        self.finished = threading.Event()
+
+    def run(self) -> None:
+        query = sa.text(
+            "SELECT phase, blocks_done, blocks_total, tuples_done, tuples_total "
+            "FROM pg_stat_progress_create_index p "
+            "JOIN pg_class c ON c.oid = p.index_relid WHERE c.relname = :name"
+        )
+        with self.engine.connect() as conn:
+            while not self.finished.wait(PROGRESS_INTERVAL_SECONDS):
+                row = conn.execute(query, {"name": self.index_name}).first()
+                conn.rollback()
+                if row is None:
+                    continue
+                phase, blocks_done, blocks_total, tuples_done, tuples_total = row
+                pct = 100.0 * blocks_done / blocks_total if blocks_total else 0.0
+                logger.info(
+                    "%s: %s (%.1f%% blocks, %s/%s tuples)",
+                    self.index_name, phase, pct, tuples_done, tuples_total,
+                )
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: List[str],
+    unique: bool = False,
+    **kw,
+) -> None:
+    """
+    Crea un índice con CREATE INDEX CONCURRENTLY fuera de la transacción.
+
+    Si una ejecución anterior falló a mitad, PostgreSQL deja el índice
+    marcado como INVALID; se elimina antes de reintentar. En tablas
+    particionadas se construye partición a partición (ver _create_partitioned_index).
+    """
+    if not _is_postgresql():
+        op.create_index(index_name, table_name, columns, unique=unique, **kw)
+        return
+
+    bind = op.get_bind()
+    partitions = _partitions(bind, table_name)
+    if partitions:
+        _create_partitioned_index(index_name, table_name, columns, unique, partitions)
+        return
+
+    with op.get_context().autocommit_block():
+        invalid = bind.execute(
+            sa.text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": index_name},
+        ).first()
+        if invalid:
+            logger.info("%s: dropping invalid index left by a previous run", index_name)
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+
+        # La construcción puede durar horas: solo se limita la espera del lock
+        with timeouts(statement_timeout="0"):
+            progress = _IndexProgress(bind.engine, index_name)
+            progress.start()
+            started = time.perf_counter()
+            try:
+                op.create_index(
+                    index_name, table_name, columns,
+                    unique=unique, postgresql_concurrently=True, if_not_exists=True, **kw,
+                )
+            finally:
+                progress.finished.set()
+            logger.info("%s: built in %.1fs", index_name, time.perf_counter() - started)
+
+
+def _partitions(bind: sa.engine.Connection, table_name: str) -> List[str]:
+    """Particiones de ``table_name`` (lista vacía si no está particionada)"""
+    return list(bind.execute(
+        sa.text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND p.relkind = 'p' ORDER BY c.relname"
+        ),
+        {"table": table_name},
+    ).scalars())
+
+
+def _create_partitioned_index(
+    index_name: str,
+    table_name: str,
+    columns: List[str],
+    unique: bool,
+    partitions: List[str],
+) -> None:
+    """
+    CREATE INDEX CONCURRENTLY no admite tablas particionadas: se crea el
+    índice ON ONLY en la tabla padre (instantáneo, queda inválido), cada
+    partición con CONCURRENTLY y se adjuntan; PostgreSQL marca el índice
+    padre como válido al adjuntar la última.
+    """
+    bind = op.get_bind()
+    column_list = ", ".join(columns)
+    with op.get_context().autocommit_block():
+        with timeouts():
+            op.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {index_name} "
+                f"ON ONLY {table_name} ({column_list})"
+            )
+
+    for partition in partitions:
+        # Mismo nombre que generaría PostgreSQL al crear el índice en el padre
+        child = f"{partition}_{'_'.join(columns)}_idx"
+        create_index_concurrently(child, partition, columns, unique=unique)
+        with op.get_context().autocommit_block():
+            attached = bind.execute(
+                sa.text(
+                    "SELECT 1 FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE c.relname = :child"
+                ),
+                {"child": child},
+            ).first()
+            if not attached:
+                with timeouts():
+                    op.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {child}")
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """Elimina un índice con DROP INDEX CONCURRENTLY fuera de la transacción"""
+    if not _is_postgresql():
+        op.drop_index(index_name, table_name=table_name)
+        return
+
+    with op.get_context().autocommit_block():
+        with timeouts(statement_timeout="0"):
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def backfill(
+    table_name: str,
+    column_name: str,
+    value_sql: str,
+    batch_size: Optional[int] = None,
+    pause_seconds: Optional[float] = None,
+) -> int:
+    """
+    Rellena ``column_name`` donde sea NULL, por rangos de ``id``, con un
+    commit por lote y una pausa entre lotes para no saturar la réplica ni el WAL.
+
+    Returns:
+        Número total de filas actualizadas
+    """
+    batch_size = batch_size or settings.MIGRATION_BACKFILL_BATCH_SIZE
+    pause_seconds = settings.MIGRATION_BACKFILL_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+    bind = op.get_bind()
+
+    bounds = bind.execute(sa.text(f"SELECT min(id), max(id) FROM {table_name}")).first()
+    if bounds is None or bounds[0] is None:
+        return 0
+    low, high = bounds
+
+    update = sa.text(
+        f"UPDATE {table_name} SET {column_name} = {value_sql} "
+        f"WHERE id >= :lo AND id < :hi AND {column_name} IS NULL"
+    )
+    total = 0
+    started = last_report = time.perf_counter()
+    with op.get_context().autocommit_block():
+        for lo in range(low, high + 1, batch_size):
+            total += bind.execute(update, {"lo": lo, "hi": lo + batch_size}).rowcount
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL_SECONDS:
+                pct = 100.0 * (lo + batch_size - low) / (high - low + 1)
+                logger.info(
+                    "%s.%s: backfill %.1f%% (%d rows, %.0f rows/s)",
+                    table_name, column_name, min(pct, 100.0), total, total / (now - started),
+                )
+                last_report = now
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+    logger.info("%s.%s: backfilled %d rows in %.1fs", table_name, column_name, total, time.perf_counter() - started)
+    return total
+
+
+def add_column_backfilled(
+    table_name: str,
+    column: sa.Column,
+    backfill_sql: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    pause_seconds: Optional[float] = None,
+) -> None:
+    """
+    Añade una columna NOT NULL con server_default sin reescribir la tabla
+    bajo ACCESS EXCLUSIVE.
+
+    Args:
+        table_name: Tabla destino
+        column: Columna a crear (se respetan server_default y nullable)
+        backfill_sql: Expresión SQL para filas existentes (default: el server_default)
+    """
+    server_default = column.server_default
+    nullable = column.nullable
+
+    if not _is_postgresql():
+        # SQLite no admite ADD COLUMN con defaults no constantes: batch recrea la tabla
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(column)
+        if backfill_sql is not None:
+            op.execute(f"UPDATE {table_name} SET {column.name} = {backfill_sql}")
+        return
+
+    default_sql = None
+    if server_default is not None and isinstance(server_default.arg, sa.sql.ClauseElement):
+        default_sql = str(server_default.arg.compile(dialect=op.get_bind().dialect))
+    elif server_default is not None:
+        default_sql = f"'{server_default.arg}'"
+
+    # 1. Columna nullable y sin default: solo cambia el catálogo
+    column.server_default = None
+    column.nullable = True
+    with timeouts():
+        op.add_column(table_name, column)
+        # 2. Las filas nuevas ya reciben el default
+        if default_sql is not None:
+            op.execute(f"ALTER TABLE {table_name} ALTER COLUMN {column.name} SET DEFAULT {default_sql}")
+
+    # 3. Filas existentes, por lotes
+    value_sql = backfill_sql or default_sql
+    if value_sql is not None:
+        backfill(table_name, column.name, value_sql, batch_size, pause_seconds)
+
+    # 4. NOT NULL validado con un CHECK NOT VALID (VALIDATE solo toma SHARE UPDATE EXCLUSIVE)
+    if nullable is False:
+        check_name = f"ck_{table_name}_{column.name}_not_null"
+        with op.get_context().autocommit_block():
+            with timeouts():
+                op.execute(
+                    f"ALTER TABLE {table_name} ADD CONSTRAINT {check_name} "
+                    f"CHECK ({column.name} IS NOT NULL) NOT VALID"
+                )
+            with timeouts(statement_timeout="0"):
+                op.execute(f"ALTER TABLE {table_name} VALIDATE CONSTRAINT {check_name}")
+            with timeouts():
+                # PostgreSQL 12+ usa el CHECK validado y no vuelve a escanear la tabla
+                op.execute(f"ALTER TABLE {table_name} ALTER COLUMN {column.name} SET NOT NULL")
+                op.execute(f"ALTER TABLE {table_name} DROP CONSTRAINT {check_name}")
+
+    column.server_default = server_default
+    column.nullable = nullable
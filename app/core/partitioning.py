@@ -0,0 +1,147 @@
+"""
+Migración de ``items`` a una tabla particionada por HASH (owner_id).
+
+Proceso online en cuatro pasos (todos sobre una Connection de SQLAlchemy,
+así que los usan tanto la revisión de Alembic como app.tools.partition_items):
+
+1. ``create_shadow_table``: crea ``items_partitioned`` con N particiones y
+   un trigger en ``items`` que replica cada INSERT/UPDATE/DELETE
+2. ``copy_batch``: copia filas existentes por rangos de id (ON CONFLICT DO
+   NOTHING: si el trigger ya la escribió, gana la versión del trigger)
+3. ``reconcile_batch``: elimina filas copiadas que se borraron de ``items``
+   mientras la copia estaba en curso
+4. ``swap``: en una transacción corta renombra las tablas; la antigua queda
+   como ``items_unpartitioned`` para poder volver atrás
+
+Todas las consultas de item_service filtran por owner_id, así que el
+planner descarta todas las particiones salvo una.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+SHADOW = "items_partitioned"
+OLD = "items_unpartitioned"
+COLUMNS = "id, title, description, owner_id, created_at, updated_at"
+# Columnas con índice ix_items_<columna>; las que se añadieron después de la
+# revisión e3a8b5d04f17 pueden no existir todavía en la tabla sombra
+INDEXED_COLUMNS = ("id", "title", "owner_id", "created_at")
+
+
+def create_shadow_table(conn: Connection, partitions: int) -> None:
+    """Crea la tabla particionada vacía, sus índices y el trigger de réplica"""
+    conn.execute(text(f"""
+        CREATE TABLE {SHADOW} (
+            id integer NOT NULL DEFAULT nextval('items_id_seq'),
+            title varchar NOT NULL,
+            description text,
+            owner_id integer NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT {SHADOW}_pkey PRIMARY KEY (id, owner_id),
+            CONSTRAINT {SHADOW}_owner_id_fkey FOREIGN KEY (owner_id) REFERENCES users (id)
+        ) PARTITION BY HASH (owner_id)
+    """))
+    for remainder in range(partitions):
+        conn.execute(text(
+            f"CREATE TABLE items_p{remainder} PARTITION OF {SHADOW} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        ))
+    # Mismos índices que el modelo Item (ix_items_*), renombrados en el swap
+    for column in INDEXED_COLUMNS:
+        conn.execute(text(f"CREATE INDEX ix_{SHADOW}_{column} ON {SHADOW} ({column})"))
+
+    conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION items_partition_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND NEW.owner_id <> OLD.owner_id) THEN
+                DELETE FROM {SHADOW} WHERE id = OLD.id AND owner_id = OLD.owner_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {SHADOW} ({COLUMNS})
+                VALUES (NEW.id, NEW.title, NEW.description, NEW.owner_id, NEW.created_at, NEW.updated_at)
+                ON CONFLICT (id, owner_id) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    description = EXCLUDED.description,
+                    created_at = EXCLUDED.created_at,
+                    updated_at = EXCLUDED.updated_at;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """))
+    conn.execute(text(
+        "CREATE TRIGGER items_partition_sync AFTER INSERT OR UPDATE OR DELETE ON items "
+        "FOR EACH ROW EXECUTE FUNCTION items_partition_sync()"
+    ))
+
+
+def drop_shadow_table(conn: Connection) -> None:
+    """Deshace create_shadow_table (solo antes del swap)"""
+    conn.execute(text("DROP TRIGGER IF EXISTS items_partition_sync ON items"))
+    conn.execute(text("DROP FUNCTION IF EXISTS items_partition_sync()"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {SHADOW}"))
+
+
+def copy_batch(conn: Connection, low: int, high: int) -> int:
+    """Copia las filas con id en [low, high). Returns: filas insertadas"""
+    return conn.execute(
+        text(
+            f"INSERT INTO {SHADOW} ({COLUMNS}) SELECT {COLUMNS} FROM items "
+            f"WHERE id >= :lo AND id < :hi ON CONFLICT (id, owner_id) DO NOTHING"
+        ),
+        {"lo": low, "hi": high},
+    ).rowcount
+
+
+def reconcile_batch(conn: Connection, low: int, high: int) -> int:
+    """Borra de la copia las filas con id en [low, high) que ya no existen. Returns: filas borradas"""
+    return conn.execute(
+        text(
+            f"DELETE FROM {SHADOW} p WHERE p.id >= :lo AND p.id < :hi "
+            f"AND NOT EXISTS (SELECT 1 FROM items i WHERE i.id = p.id AND i.owner_id = p.owner_id)"
+        ),
+        {"lo": low, "hi": high},
+    ).rowcount
+
+
+def swap(conn: Connection, lock_timeout: str) -> None:
+    """
+    Sustituye ``items`` por la tabla particionada.
+
+    Debe ejecutarse dentro de una transacción: toma ACCESS EXCLUSIVE sobre
+    ``items`` solo durante los renombrados (milisegundos) y falla tras
+    ``lock_timeout`` en vez de bloquear las escrituras si hay transacciones largas.
+    """
+    conn.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+    conn.execute(text("LOCK TABLE items IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text("DROP TRIGGER items_partition_sync ON items"))
+    conn.execute(text("DROP FUNCTION items_partition_sync()"))
+
+    conn.execute(text(f"ALTER TABLE items RENAME TO {OLD}"))
+    conn.execute(text(f"ALTER TABLE {OLD} RENAME CONSTRAINT items_pkey TO {OLD}_pkey"))
+    conn.execute(text(f"ALTER TABLE {OLD} RENAME CONSTRAINT items_owner_id_fkey TO {OLD}_owner_id_fkey"))
+
+    conn.execute(text(f"ALTER TABLE {SHADOW} RENAME TO items"))
+    conn.execute(text(f"ALTER TABLE items RENAME CONSTRAINT {SHADOW}_pkey TO items_pkey"))
+    conn.execute(text(f"ALTER TABLE items RENAME CONSTRAINT {SHADOW}_owner_id_fkey TO items_owner_id_fkey"))
+
+    for column in INDEXED_COLUMNS:
+        conn.execute(text(f"ALTER INDEX IF EXISTS ix_items_{column} RENAME TO ix_{OLD}_{column}"))
+        conn.execute(text(f"ALTER INDEX IF EXISTS ix_{SHADOW}_{column} RENAME TO ix_items_{column}"))
+
+    conn.execute(text("ALTER SEQUENCE items_id_seq OWNED BY items.id"))
+
+
+def has_shadow_table(conn: Connection) -> bool:
+    """True si la copia está en curso (``items_partitioned`` existe y aún no se hizo el swap)"""
+    return bool(conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_class WHERE relname = :name AND pg_table_is_visible(oid))"),
+        {"name": SHADOW},
+    ).scalar())
+
+
+def is_partitioned(conn: Connection) -> bool:
+    """True si ``items`` ya es una tabla particionada"""
+    return bool(conn.execute(
+        text("SELECT c.relkind = 'p' FROM pg_class c WHERE c.relname = 'items' AND pg_table_is_visible(c.oid)")
+    ).scalar())
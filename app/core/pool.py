@@ -0,0 +1,98 @@
+"""
+Salud y métricas del pool de conexiones.
+
+Sin pool_pre_ping (un SELECT 1 por checkout), una conexión que el servidor
+o un proxy han cerrado se detecta de dos formas:
+
+- en segundo plano: PoolLivenessChecker toma una conexión cada
+  DB_POOL_LIVENESS_SECONDS y ejecuta SELECT 1. El pool es FIFO, así que
+  prueba la conexión que más tiempo lleva ociosa. Si falla por
+  desconexión, SQLAlchemy invalida el pool entero y todas las conexiones
+  anteriores se reabren en su siguiente checkout, antes de que las use
+  una petición
+- al usarla: el mismo mecanismo lo dispara el error de la primera
+  petición que encuentre la conexión caída (solo falla esa petición)
+
+pool_recycle (DB_POOL_RECYCLE) cubre los cierres por inactividad previsibles.
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("db_pool_size", "Conexiones abiertas en el pool (sin overflow)")
+metrics.describe("db_pool_checked_out", "Conexiones prestadas ahora mismo")
+metrics.describe("db_pool_overflow", "Conexiones por encima de DB_POOL_SIZE")
+metrics.describe("db_pool_checkouts_total", "Préstamos de conexión")
+metrics.describe("db_pool_connects_total", "Conexiones nuevas abiertas contra la BD")
+metrics.describe("db_pool_invalidations_total", "Conexiones descartadas por error o desconexión")
+metrics.describe("db_pool_hold_seconds_total", "Tiempo total con conexiones prestadas")
+metrics.describe("db_pool_liveness_failures_total", "Comprobaciones de liveness fallidas")
+
+_CHECKED_OUT_AT = "checked_out_at"
+
+
+class PoolLivenessChecker(threading.Thread):
+    """Comprueba periódicamente que el pool tiene conexiones vivas"""
+
+    def __init__(self, engine: Engine, interval: float):
+        super().__init__(daemon=True, name="db-pool-liveness")
+        self.engine = engine
+        self.interval = interval
+        self.finished = threading.Event()
+
+    def run(self) -> None:
+        while not self.finished.wait(self.interval):
+            try:
+                with self.engine.connect() as conn:
+                    conn.exec_driver_sql("SELECT 1")
+            except DBAPIError as exc:
+                # Si es una desconexión, SQLAlchemy ya ha invalidado el pool
+                metrics.inc("db_pool_liveness_failures_total")
+                logger.warning("pool liveness check failed: %s", exc.orig)
+
+
+def _on_checkout(dbapi_connection, record, proxy) -> None:
+    record.info[_CHECKED_OUT_AT] = time.perf_counter()
+    metrics.inc("db_pool_checkouts_total")
+
+
+def _on_checkin(dbapi_connection, record) -> None:
+    started = record.info.pop(_CHECKED_OUT_AT, None)
+    if started is not None:
+        metrics.inc("db_pool_hold_seconds_total", time.perf_counter() - started)
+
+
+def setup_pool_monitoring(engine: Engine) -> None:
+    """
+    Registra las métricas del pool y arranca el PoolLivenessChecker
+    (si DB_POOL_LIVENESS_SECONDS > 0).
+
+    Args:
+        engine: Engine cuyo pool se vigila
+    """
+    pool = engine.pool
+    event.listen(pool, "checkout", _on_checkout)
+    event.listen(pool, "checkin", _on_checkin)
+    event.listen(pool, "connect", lambda dbapi_connection, record: metrics.inc("db_pool_connects_total"))
+    event.listen(pool, "invalidate", lambda dbapi_connection, record, exc: metrics.inc("db_pool_invalidations_total"))
+
+    def _collect(registry) -> None:
+        # QueuePool; otros pools (p.ej. SQLite en memoria) no exponen estos contadores
+        if hasattr(pool, "checkedout"):
+            registry.set("db_pool_size", pool.size())
+            registry.set("db_pool_checked_out", pool.checkedout())
+            registry.set("db_pool_overflow", max(pool.overflow(), 0))
+
+    metrics.add_collector(_collect)
+
+    if settings.DB_POOL_LIVENESS_SECONDS > 0:
+        PoolLivenessChecker(engine, settings.DB_POOL_LIVENESS_SECONDS).start()
@@ -0,0 +1,181 @@
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import fastapi
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+import app
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.core.revocation import revocations
+from app.core.security import decode_access_token_claims
+from app.models.user import User
+
+metrics.describe("profiling_profiles_total", "Perfiles de petición capturados")
+
+PROFILE_HEADER = "X-Profile"          # "1" → a disco, "inline" → en la respuesta
+SECRET_HEADER = "X-Profile-Secret"
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+# Solo cuentan las pilas que pasan por código de la app o de FastAPI;
+# el event loop y los hilos del threadpool en espera se descartan
+_INTERESTING = (os.path.dirname(app.__file__), os.path.dirname(fastapi.__file__))
+
+
+class StackSampler(threading.Thread):
+    """
+    Profiler por muestreo: cada SAMPLE_INTERVAL_SECONDS toma las pilas de
+    todos los hilos del proceso y acumula las que están ejecutando la petición.
+
+    Los endpoints síncronos corren en el threadpool, fuera del hilo del
+    middleware, por eso se muestrea todo el proceso en vez de usar cProfile.
+    Si el worker atiende otras peticiones a la vez, también aparecen.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.samples: Counter = Counter()
+        self._finished = threading.Event()
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        while not self._finished.wait(SAMPLE_INTERVAL_SECONDS):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                interesting = False
+                while frame is not None:
+                    code = frame.f_code
+                    interesting = interesting or code.co_filename.startswith(_INTERESTING)
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if interesting:
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> str:
+        """
+        Detiene el muestreo.
+
+        Returns:
+            Pilas en formato "collapsed" (compatible con flamegraph.pl / speedscope)
+        """
+        self._finished.set()
+        self.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _is_superuser(token: str) -> bool:
+    claims = decode_access_token_claims(token)
+    if not claims or claims.get("sub") is None:
+        return False
+    db = SessionLocal()
+    try:
+        revocations.ensure_started(db)
+        if revocations.is_token_revoked(claims.get("jti")):
+            return False
+        user = db.query(User.id, User.is_superuser).filter(User.email == claims["sub"]).first()
+        if user is None or revocations.is_user_revoked(user.id, claims.get("iat", 0)):
+            return False
+        return bool(user.is_superuser)
+    finally:
+        db.close()
+
+
+def _enforce_disk_budget(directory: Path) -> None:
+    """Borra los perfiles más antiguos hasta quedar por debajo de PROFILING_MAX_DISK_MB"""
+    files = sorted(directory.glob("*.collapsed"), key=lambda f: f.stat().st_mtime)
+    total = sum(f.stat().st_size for f in files)
+    budget = settings.PROFILING_MAX_DISK_MB * 1024 * 1024
+    for oldest in files:
+        if total <= budget:
+            break
+        total -= oldest.stat().st_size
+        oldest.unlink(missing_ok=True)
+
+
+def _write_profile(name: str, collapsed: str) -> None:
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_text(collapsed)
+    _enforce_disk_budget(directory)
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Perfilado bajo demanda de una petición concreta.
+
+    - Con la cabecera ``X-Profile: 1`` (o ``inline``) y un superusuario o
+      ``X-Profile-Secret`` válido, perfila esa petición.
+    - Con PROFILING_SAMPLE_EVERY = N > 0, perfila además 1 de cada N
+      peticiones automáticamente.
+
+    El resultado se guarda en PROFILING_DIR (limitado a PROFILING_MAX_DISK_MB)
+    o, con ``inline``, sustituye el cuerpo de la respuesta.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._counter = itertools.count(1)
+
+    async def _requested(self, request: Request) -> Optional[str]:
+        mode = request.headers.get(PROFILE_HEADER)
+        if not mode:
+            return None
+
+        secret = request.headers.get(SECRET_HEADER, "")
+        if settings.PROFILING_SECRET and hmac.compare_digest(secret, settings.PROFILING_SECRET):
+            return mode
+
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token and await run_in_threadpool(_is_superuser, token):
+            return mode
+        return None
+
+    async def dispatch(self, request: Request, call_next):
+        mode = await self._requested(request)
+        every = settings.PROFILING_SAMPLE_EVERY
+        if mode is None and every > 0 and next(self._counter) % every == 0:
+            mode = "sampled"
+        if mode is None:
+            return await call_next(request)
+
+        sampler = StackSampler()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = await call_next(request)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        finally:
+            collapsed = sampler.stop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.inc("profiling_profiles_total", mode=mode)
+
+        if mode == "inline":
+            return Response(
+                content=collapsed,
+                media_type="text/plain",
+                headers={"X-Profile-Status": str(response.status_code), "X-Profile-Ms": f"{elapsed_ms:.1f}"},
+            )
+
+        slug = request.url.path.strip("/").replace("/", "_") or "root"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{request.method}-{slug}-{elapsed_ms:.0f}ms.collapsed"
+        await run_in_threadpool(_write_profile, name, collapsed)
+
+        # raw_headers conserva las cabeceras repetidas (p.ej. varias Set-Cookie)
+        replayed = Response(content=body, status_code=response.status_code)
+        replayed.raw_headers = [
+            (name, value) for name, value in response.raw_headers if name != b"content-length"
+        ] + [(b"content-length", str(len(body)).encode("latin-1"))]
+        return replayed
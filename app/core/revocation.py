@@ -0,0 +1,196 @@
+"""
+Lista de revocación de access tokens en memoria, una por worker.
+
+- ``/auth/logout`` revoca un token concreto (claim ``jti``); la revocación
+  de administración invalida todos los tokens de un usuario emitidos antes
+  de un instante (claim ``iat``)
+- Las revocaciones se guardan en ``revoked_tokens``; cada worker mantiene
+  una copia (dicts jti -> exp y user_id -> corte) que un hilo refresca de
+  forma incremental cada TOKEN_REVOCATION_SYNC_SECONDS
+- La comprobación en get_current_user es una búsqueda en un dict: O(1) y
+  sin ir a la BD
+- Cada entrada se descarta cuando caduca el último token al que afecta, así
+  que la memoria es proporcional a las revocaciones de los últimos
+  JWT_ACCESS_TOKEN_EXPIRE_MINUTES, no al histórico
+
+Es un conjunto exacto y no un filtro de Bloom: sin falsos positivos no hace
+falta confirmar en la BD, y con tokens de vida corta el conjunto vivo es
+pequeño. Las revocaciones de este worker se aplican al instante; las de los
+demás, en el siguiente refresco.
+"""
+import heapq
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("token_revocation_entries", "Revocaciones vivas en memoria por tipo")
+metrics.describe("token_revocation_memory_bytes", "Memoria estimada de la lista de revocación")
+metrics.describe("token_revocation_rejected_total", "Peticiones rechazadas por token revocado")
+metrics.describe("token_revocation_sync_errors_total", "Refrescos fallidos de la lista de revocación")
+
+PURGE_INTERVAL_SECONDS = 3600
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite devuelve datetimes naive aunque la columna sea timezone=True
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class RevocationList:
+    """Revocaciones vivas de access tokens (ver docstring del módulo)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._jtis: Dict[str, float] = {}      # jti -> exp del token
+        self._users: Dict[int, float] = {}     # user_id -> tokens con iat anterior están revocados
+        self._expiry: List[Tuple[float, str, object]] = []  # heap (caduca, tipo, clave)
+        self._since: Optional[datetime] = None
+        self._engine: Optional[Engine] = None
+        self._pid: Optional[int] = None
+
+    @staticmethod
+    def _ttl() -> float:
+        return settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60.0
+
+    def add_token(self, jti: str, expires_at: float) -> None:
+        """Revoca un token hasta su ``exp``"""
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._jtis[jti] = expires_at
+            heapq.heappush(self._expiry, (expires_at, "jti", jti))
+
+    def add_user(self, user_id: int, cutoff: float) -> None:
+        """Revoca los tokens del usuario emitidos antes de ``cutoff``"""
+        # iat va en segundos enteros: un token emitido en el mismo segundo que
+        # la revocación (p.ej. el login justo después) no debe quedar revocado
+        cutoff = math.floor(cutoff)
+        expires_at = cutoff + self._ttl()
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            if cutoff > self._users.get(user_id, 0.0):
+                self._users[user_id] = cutoff
+                heapq.heappush(self._expiry, (expires_at, "user", user_id))
+
+    def is_token_revoked(self, jti: Optional[str]) -> bool:
+        """True si el token (por su ``jti``) está revocado"""
+        return jti is not None and jti in self._jtis
+
+    def is_user_revoked(self, user_id: int, issued_at: float) -> bool:
+        """True si el token de ``user_id`` emitido en ``issued_at`` es anterior a una revocación"""
+        cutoff = self._users.get(user_id)
+        return cutoff is not None and issued_at < cutoff
+
+    def _expire(self) -> None:
+        now = time.time()
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires_at, kind, key = heapq.heappop(self._expiry)
+                if kind == "jti":
+                    if self._jtis.get(key) == expires_at:
+                        del self._jtis[key]
+                elif key in self._users and self._users[key] + self._ttl() <= now:
+                    del self._users[key]
+
+    def sync(self, db: Session) -> int:
+        """
+        Trae las revocaciones nuevas de la tabla.
+
+        Lee por ``revoked_at`` con un solape de TOKEN_REVOCATION_OVERLAP_SECONDS
+        para no perder filas de transacciones que hicieron commit tarde
+        (añadir una revocación dos veces no tiene efecto).
+
+        Returns:
+            Filas leídas
+        """
+        if self._since is None:
+            since = datetime.now(timezone.utc) - timedelta(seconds=self._ttl())
+        else:
+            since = self._since - timedelta(seconds=settings.TOKEN_REVOCATION_OVERLAP_SECONDS)
+
+        rows = db.query(
+            RevokedToken.jti, RevokedToken.user_id, RevokedToken.expires_at, RevokedToken.revoked_at
+        ).filter(RevokedToken.revoked_at > since).all()
+
+        for jti, user_id, expires_at, revoked_at in rows:
+            revoked_at = _utc(revoked_at)
+            if jti is None:
+                self.add_user(user_id, revoked_at.timestamp())
+            else:
+                self.add_token(jti, _utc(expires_at).timestamp())
+            self._since = max(self._since or revoked_at, revoked_at)
+        if self._since is None:
+            self._since = since
+        self._expire()
+        return len(rows)
+
+    def ensure_started(self, db: Session) -> None:
+        """
+        Primera carga (síncrona) e hilo de refresco, una vez por proceso.
+
+        Se comprueba el pid para volver a arrancar tras un fork (p.ej.
+        gunicorn --preload): los hilos no sobreviven al fork.
+        """
+        if self._pid == os.getpid():
+            return
+        # Las peticiones concurrentes esperan a la primera carga
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._engine = db.get_bind().engine
+            self.sync(db)
+            threading.Thread(target=self._run, daemon=True, name="token-revocation-sync").start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        last_purge = time.monotonic()
+        while True:
+            time.sleep(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+            try:
+                with Session(self._engine) as db:
+                    self.sync(db)
+                    if time.monotonic() - last_purge >= PURGE_INTERVAL_SECONDS:
+                        db.query(RevokedToken).filter(
+                            RevokedToken.expires_at < datetime.now(timezone.utc)
+                        ).delete(synchronize_session=False)
+                        db.commit()
+                        last_purge = time.monotonic()
+            except Exception:
+                metrics.inc("token_revocation_sync_errors_total")
+                logger.exception("token revocation sync failed")
+
+    def memory_bytes(self) -> int:
+        """Estimación de la memoria ocupada por las estructuras (sys.getsizeof)"""
+        with self._lock:
+            size = sys.getsizeof(self._jtis) + sys.getsizeof(self._users) + sys.getsizeof(self._expiry)
+            size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self._jtis.items())
+            size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self._users.items())
+            # Las claves del heap son las mismas que las de los dicts
+            size += sum(sys.getsizeof(entry) + sys.getsizeof(entry[0]) for entry in self._expiry)
+            return size
+
+    def _collect(self, registry) -> None:
+        registry.set("token_revocation_entries", len(self._jtis), kind="jti")
+        registry.set("token_revocation_entries", len(self._users), kind="user")
+        registry.set("token_revocation_memory_bytes", self.memory_bytes())
+
+
+# Instancia global (por worker)
+revocations = RevocationList()
+metrics.add_collector(revocations._collect)
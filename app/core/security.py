@@ -1,12 +1,25 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta,timezone
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from app.core.config import settings
+from app.core.metrics import metrics
 import hashlib
+import hmac
+import secrets
 
 # Configuracion de bcrypt para hashing de passwords
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max = default: cualquier hash con otro coste se marca para rehash
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+metrics.describe("password_verify_total", "Verificaciones de password por coste del hash almacenado")
+metrics.describe("password_rehash_total", "Hashes regenerados al coste actual durante el login")
 
 
 def _pre_hash(password: str) -> str:
@@ -40,6 +53,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(_pre_hash(plain_password), hashed_password)
 
+def _bcrypt_rounds(hashed_password: str) -> str:
+    # Formato modular crypt: $2b$<rounds>$<salt+hash>
+    parts = hashed_password.split("$")
+    return parts[2] if len(parts) > 3 else "unknown"
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica un password y, si su hash no cumple la política actual
+    (BCRYPT_ROUNDS), devuelve un hash nuevo para reemplazarlo.
+    
+    Args:
+        plain_password: Password en texto plano
+        hashed_password: Hash bcrypt almacenado
+        
+    Returns:
+        (valido, nuevo_hash): nuevo_hash es None si no hace falta actualizarlo
+    """
+    valid, new_hash = pwd_context.verify_and_update(_pre_hash(plain_password), hashed_password)
+    rounds = _bcrypt_rounds(hashed_password)
+    metrics.inc("password_verify_total", rounds=rounds)
+    if valid and new_hash is not None:
+        metrics.inc("password_rehash_total", from_rounds=rounds, to_rounds=settings.BCRYPT_ROUNDS)
+    return valid, new_hash
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Crea un JWT firmado con expiración.
@@ -61,7 +98,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = now + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
+    # jti identifica el token para poder revocarlo (ver app/core/revocation.py)
+    to_encode.update({"exp": expire, "iat": now, "jti": secrets.token_hex(16)})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
@@ -84,4 +122,49 @@ def decode_access_token(token: str) -> Optional[str]:
         email: Optional[str] = payload.get("sub")
         return email  # Esto puede ser str o None
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+def decode_access_token_claims(token: str) -> Optional[dict]:
+    """
+    Decodifica un JWT token y devuelve todos sus claims (sub, exp, iat, jti).
+    
+    Args:
+        token: JWT token a decodificar
+        
+    Returns:
+        Claims del token si es válido, None si no
+    """
+    try:
+        return jwt.decode(
+            token, 
+            settings.JWT_SECRET_KEY, 
+            algorithms=[settings.JWT_ALGORITHM]
+        )
+    except JWTError:
+        return None
+
+def generate_refresh_token() -> str:
+    """
+    Genera un refresh token opaco (no es un JWT).
+
+    Returns:
+        Token aleatorio de 256 bits codificado en base64 url-safe
+    """
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Hash con clave (HMAC-SHA256) de un refresh token para guardarlo en BD.
+
+    El token ya tiene 256 bits de entropía, así que no necesita un hash
+    lento como bcrypt: basta un HMAC, determinista y barato, que permite
+    buscarlo por índice.
+
+    Args:
+        token: Refresh token en claro
+
+    Returns:
+        Hex digest de 64 caracteres
+    """
+    key = (settings.REFRESH_TOKEN_HASH_KEY or settings.JWT_SECRET_KEY).encode("utf-8")
+    return hmac.new(key, token.encode("utf-8"), hashlib.sha256).hexdigest()
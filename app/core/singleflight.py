@@ -0,0 +1,95 @@
+import threading
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.metrics import metrics
+
+metrics.describe("singleflight_requests_total", "Lecturas que pasaron por single-flight")
+metrics.describe("singleflight_shared_total", "Lecturas servidas con el resultado de otra en vuelo")
+metrics.describe("singleflight_coalescing_ratio", "shared / requests por ruta")
+
+
+class _Call:
+    """Una ejecución en vuelo y su resultado compartido"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[bytes] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalescencia de lecturas idénticas concurrentes.
+
+    Mientras una lectura con la misma clave (owner_id, ruta, parámetros) está
+    en vuelo, las demás esperan su resultado en vez de repetir la consulta.
+    No es una caché: en cuanto termina la ejecución, la siguiente lectura
+    vuelve a ir a la BD.
+
+    Las escrituras llaman a ``invalidate(owner_id)``, que desengancha las
+    ejecuciones en vuelo del propietario: las lecturas que lleguen después
+    no se unen a una ejecución iniciada antes de la escritura.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple, _Call] = {}
+
+    def do(self, owner_id: int, route: str, params: Hashable, fn: Callable[[], bytes]) -> bytes:
+        """
+        Ejecuta ``fn`` o espera a la ejecución idéntica que ya está en vuelo.
+
+        Args:
+            owner_id: Propietario de los datos leídos
+            route: Identificador de la ruta
+            params: Parámetros de consulta (hashables)
+            fn: Función que hace la consulta y devuelve la respuesta serializada
+
+        Returns:
+            Respuesta serializada (compartida entre todas las lecturas coalescidas)
+        """
+        with self._lock:
+            key = (owner_id, route, params)
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        metrics.inc("singleflight_requests_total", route=route)
+        if not leader:
+            metrics.inc("singleflight_shared_total", route=route)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                # Tras un invalidate() la clave puede pertenecer ya a otra ejecución
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def invalidate(self, owner_id: int) -> None:
+        """Separa las lecturas futuras de las que estén en vuelo para ``owner_id``"""
+        with self._lock:
+            for key in [key for key in self._calls if key[0] == owner_id]:
+                del self._calls[key]
+
+
+def _collect_ratio(registry) -> None:
+    for labels, total in registry.series("singleflight_requests_total").items():
+        shared = registry.get("singleflight_shared_total", **dict(labels))
+        registry.set("singleflight_coalescing_ratio", shared / total if total else 0.0, **dict(labels))
+
+
+metrics.add_collector(_collect_ratio)
+
+# Instancia global para las lecturas de ítems
+item_reads = SingleFlight()
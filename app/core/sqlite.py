@@ -0,0 +1,67 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+metrics.describe("sqlite_writer_wait_seconds_total", "Tiempo esperando el turno de escritura")
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+_HOLDS_WRITER = "sqlite_holds_writer"
+
+# Un único escritor por proceso: los hilos esperan su turno aquí en vez de
+# reintentar dentro del busy handler de SQLite (backoff con sleeps)
+writer_lock = threading.Lock()
+
+
+def _set_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL: los lectores no bloquean al escritor ni al revés
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+        # Valor negativo = tamaño en KiB en lugar de páginas
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _acquire_writer(conn, cursor, statement, parameters, context, executemany) -> None:
+    if conn.info.get(_HOLDS_WRITER) or not statement.lstrip().upper().startswith(WRITE_STATEMENTS):
+        return
+    if not writer_lock.acquire(blocking=False):
+        started = time.perf_counter()
+        writer_lock.acquire()
+        metrics.inc("sqlite_writer_wait_seconds_total", time.perf_counter() - started)
+    conn.info[_HOLDS_WRITER] = True
+
+
+def _release_writer(info: dict) -> None:
+    if info.pop(_HOLDS_WRITER, False):
+        writer_lock.release()
+
+
+def configure_sqlite(engine: Engine) -> None:
+    """
+    Ajusta un engine SQLite para uso concurrente desde la API.
+
+    - PRAGMAs de WAL, synchronous, mmap_size y cache_size en cada conexión
+    - cola de escritura: la primera sentencia de escritura de una
+      transacción espera el ``writer_lock`` y lo libera en commit/rollback,
+      evitando ``database is locked`` entre hilos del mismo proceso.
+      Entre procesos (varios workers) sigue actuando ``busy_timeout``.
+    """
+    event.listen(engine, "connect", _set_pragmas)
+    event.listen(engine, "before_cursor_execute", _acquire_writer)
+    # El evento "commit" llega justo antes del COMMIT real; ese margen lo cubre busy_timeout
+    event.listen(engine, "commit", lambda conn: _release_writer(conn.info))
+    event.listen(engine, "rollback", lambda conn: _release_writer(conn.info))
+    # Conexiones devueltas al pool sin commit/rollback explícito
+    event.listen(engine.pool, "checkin", lambda dbapi_conn, record: _release_writer(record.info))
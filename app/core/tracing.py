@@ -0,0 +1,317 @@
+"""
+Tracing en proceso con árboles de spans exportados a fichero local (OTLP-JSON).
+
+- Un span raíz por petición (middleware ASGI), que continúa la traza de la
+  cabecera W3C ``traceparent`` si viene y la devuelve en la respuesta
+- Spans hijos con ``span("nombre")`` o el decorador ``traced``, uno por
+  sentencia SQL (eventos del engine) y otro para la serialización de la respuesta
+- Tail sampling: al terminar la petición se guarda la traza solo si fue
+  lenta (TRACING_SLOW_MS), dio error, venía marcada como sampled o cae en
+  TRACING_SAMPLE_RATE; el resto se descarta
+- Exportación asíncrona: un hilo escribe cada traza como una línea
+  OTLP-JSON en TRACING_FILE, rotando por tamaño
+
+Con TRACING_ENABLED=False no se instala nada: ``span``/``traced`` solo
+leen una ContextVar vacía.
+"""
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import secrets
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import fastapi.routing
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+metrics.describe("tracing_traces_total", "Trazas terminadas por decisión de tail sampling")
+metrics.describe("tracing_export_dropped_total", "Trazas descartadas por cola de exportación llena")
+
+# Tipos de span OTLP
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+STATUS_ERROR = 2
+
+_NOOP = nullcontext()
+
+
+class Span:
+    """Un span: intervalo con nombre, atributos y padre dentro de una traza"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: str, kind: int = KIND_INTERNAL):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, object] = {}
+        self.error: Optional[str] = None
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        self.trace.spans.append(self)
+
+    def to_otlp(self) -> dict:
+        otlp = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+        }
+        if self.error is not None:
+            otlp["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return otlp
+
+
+class Trace:
+    """Spans de una petición; list.append es atómico, así que sirve entre hilos"""
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def _otlp_attribute(key: str, value: object) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _start(name: str, kind: int = KIND_INTERNAL) -> Optional[Span]:
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, kind)
+
+
+@contextmanager
+def _run(span: Span) -> Iterator[Span]:
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def span(name: str, **attributes):
+    """
+    Context manager que abre un span hijo del span actual.
+
+    Fuera de una petición trazada no hace nada.
+    """
+    child = _start(name)
+    if child is None:
+        return _NOOP
+    child.attributes.update(attributes)
+    return _run(child)
+
+
+def traced(name: str):
+    """Decorador: ejecuta la función dentro de un span ``name``"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def parse_traceparent(header: Optional[str]):
+    """
+    Parsea una cabecera W3C traceparent (``00-<trace-id>-<parent-id>-<flags>``).
+
+    Returns:
+        (trace_id, parent_id, sampled) o None si falta o no es válida
+    """
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 0x01)
+
+
+class TraceExporter(threading.Thread):
+    """Escribe trazas en OTLP-JSON (una por línea) desde un hilo propio"""
+
+    def __init__(self):
+        super().__init__(daemon=True, name="trace-exporter")
+        self.queue: "queue.Queue[Trace]" = queue.Queue(maxsize=settings.TRACING_QUEUE_SIZE)
+        path = Path(settings.TRACING_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=settings.TRACING_MAX_BYTES, backupCount=settings.TRACING_BACKUP_COUNT,
+        )
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+        self.resource = {"attributes": [
+            _otlp_attribute("service.name", settings.APP_NAME),
+            _otlp_attribute("service.version", settings.VERSION),
+            _otlp_attribute("deployment.environment", settings.ENVIRONMENT),
+        ]}
+
+    def submit(self, trace: Trace) -> None:
+        try:
+            self.queue.put_nowait(trace)
+        except queue.Full:
+            metrics.inc("tracing_export_dropped_total")
+
+    def run(self) -> None:
+        while True:
+            trace = self.queue.get()
+            document = {"resourceSpans": [{
+                "resource": self.resource,
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [s.to_otlp() for s in trace.spans],
+                }],
+            }]}
+            self.handler.emit(logging.makeLogRecord({"msg": json.dumps(document, separators=(",", ":"))}))
+
+
+class TracingMiddleware:
+    """Middleware ASGI: span raíz por petición, traceparent y tail sampling"""
+
+    def __init__(self, app, exporter: TraceExporter):
+        self.app = app
+        self.exporter = exporter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        incoming = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        trace_id, parent_id, sampled = incoming or (secrets.token_hex(16), "", False)
+
+        trace = Trace(trace_id, sampled)
+        root = Span(trace, f"{scope['method']} {scope['path']}", parent_id, KIND_SERVER)
+        root.attributes.update({"http.method": scope["method"], "http.target": scope["path"]})
+        traceparent = f"00-{trace_id}-{root.span_id}-{'01' if sampled else '00'}".encode("latin-1")
+
+        async def send_with_traceparent(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"traceparent", traceparent)]
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_with_traceparent)
+        except BaseException as exc:
+            root.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            _current_span.reset(token)
+            root.end()
+            self._finish(trace, root)
+
+    def _finish(self, trace: Trace, root: Span) -> None:
+        duration_ms = (root.end_ns - root.start_ns) / 1e6
+        status = root.attributes.get("http.status_code", 500)
+        keep = (
+            trace.sampled
+            or root.error is not None
+            or status >= 500
+            or duration_ms >= settings.TRACING_SLOW_MS
+            or random.random() < settings.TRACING_SAMPLE_RATE
+        )
+        metrics.inc("tracing_traces_total", decision="kept" if keep else "dropped")
+        if keep:
+            self.exporter.submit(trace)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    child = _start("db.query", KIND_CLIENT)
+    if child is not None:
+        child.attributes.update({"db.system": conn.dialect.name, "db.statement": statement})
+        context._trace_span = child
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    child = getattr(context, "_trace_span", None)
+    if child is not None:
+        child.attributes["db.rows"] = cursor.rowcount
+        child.end()
+        context._trace_span = None
+
+
+def _handle_error(exception_context) -> None:
+    context = exception_context.execution_context
+    child = getattr(context, "_trace_span", None) if context is not None else None
+    if child is not None:
+        child.error = str(exception_context.original_exception)
+        child.end()
+        context._trace_span = None
+
+
+def _trace_serialization() -> None:
+    # FastAPI serializa response_model dentro del handler de la ruta; no hay
+    # otro punto de enganche que sustituir la función del módulo
+    original = fastapi.routing.serialize_response
+
+    @functools.wraps(original)
+    async def serialize_response(*args, **kwargs):
+        with span("response.serialize"):
+            return await original(*args, **kwargs)
+
+    fastapi.routing.serialize_response = serialize_response
+
+
+def setup_tracing(app, engine: Engine) -> None:
+    """
+    Activa el tracing: middleware, spans SQL, span de serialización y exportador.
+
+    Args:
+        app: Aplicación FastAPI
+        engine: Engine de SQLAlchemy cuyas sentencias se trazan
+    """
+    exporter = TraceExporter()
+    exporter.start()
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    _trace_serialization()
+    app.add_middleware(TracingMiddleware, exporter=exporter)
@@ -1,6 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import metrics
+from app.core.pool import setup_pool_monitoring
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import setup_tracing
 from app.core.logging import setup_logging
 from app.api.v1.router import api_router
 
@@ -13,6 +20,9 @@ app = FastAPI(
     debug=settings.DEBUG,
 )
 
+# Métricas del pool y comprobación de conexiones en segundo plano
+setup_pool_monitoring(engine)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
@@ -23,8 +33,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
+# Compresión negociada (gzip/br/zstd)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Profiling bajo demanda (opt-in)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Tracing (opt-in); se añade el último para ser el middleware más externo
+if settings.TRACING_ENABLED:
+    setup_tracing(app, engine)
+
 
 # Health check endpoint
 @app.get("/health")
@@ -36,6 +59,11 @@ async def health_check():
         "environment": settings.ENVIRONMENT,
     }
 
+# Metrics endpoint (formato de texto de Prometheus, por worker)
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint():
+    return metrics.render()
+
 # Root endpoint
 @app.get("/")
 async def root():
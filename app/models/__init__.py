@@ -1,5 +1,8 @@
 from app.core.database import Base
 from app.models.user import User
 from app.models.item import Item
+from app.models.refresh_token import RefreshToken
+from app.models.revoked_token import RevokedToken
+from app.models.stats import ItemDailyStats, StatsWatermark, UserItemStats
 
-__all__ = ["Base", "User", "Item"]
\ No newline at end of file
+__all__ = ["Base", "User", "Item", "RefreshToken", "RevokedToken", "ItemDailyStats", "UserItemStats", "StatsWatermark"]
\ No newline at end of file
@@ -5,15 +5,20 @@ from app.core.database import Base
 
 class Item(Base):
     __tablename__ = "items"
+    # created_at/updated_at vuelven en el RETURNING del INSERT/UPDATE: sin refresh()
+    __mapper_args__ = {"eager_defaults": True}
 
-    id = Column(Integer, primary_key=True, index=True)
+    # PK (id, owner_id) como la tabla particionada: los UPDATE/DELETE del
+    # flush filtran también por owner_id y tocan una sola partición
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(Text, nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True, index=True, nullable=False)
     created_at = Column(
         DateTime(timezone=True), 
         nullable=False, 
-        server_default=func.now()
+        server_default=func.now(),
+        index=True  # watermark de los rollups de app/services/stats_service.py
     )
     updated_at = Column(
         DateTime(timezone=True), 
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # HMAC-SHA256 del token opaco (nunca se guarda el token en claro)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    # Todas las rotaciones de un mismo login comparten family_id
+    family_id = Column(String(32), index=True, nullable=False)
+    # user_id: revocación de administración; expires_at: purga de caducados
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), 
+        nullable=False, 
+        server_default=func.now()
+    )
+
+    # Relationship back to User
+    user = relationship("User", back_populates="refresh_tokens")
+
+    def __repr__(self):
+        return f"<RefreshToken id={self.id} user_id={self.user_id} family_id={self.family_id}>"
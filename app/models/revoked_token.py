@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Claim jti del access token revocado; NULL = todos los del usuario emitidos antes de revoked_at
+    jti = Column(String(32), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Hasta cuándo hace falta recordar la revocación (exp del token afectado)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(
+        DateTime(timezone=True), 
+        nullable=False, 
+        server_default=func.now(),
+        index=True  # refresco incremental de app/core/revocation.py
+    )
+
+    def __repr__(self):
+        return f"<RevokedToken id={self.id} user_id={self.user_id} jti={self.jti}>"
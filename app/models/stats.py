@@ -0,0 +1,36 @@
+from sqlalchemy import BigInteger, Column, Date, DateTime, ForeignKey, Integer, String
+from app.core.database import Base
+
+# Rollups para /admin/stats: los mantiene app/services/stats_service.py a
+# partir de items.created_at, nunca se escriben desde las peticiones
+
+
+class ItemDailyStats(Base):
+    __tablename__ = "stats_items_daily"
+
+    day = Column(Date, primary_key=True)
+    items_created = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ItemDailyStats day={self.day} items_created={self.items_created}>"
+
+
+class UserItemStats(Base):
+    __tablename__ = "stats_user_items"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    item_count = Column(Integer, index=True, nullable=False)
+
+    def __repr__(self):
+        return f"<UserItemStats user_id={self.user_id} item_count={self.item_count}>"
+
+
+class StatsWatermark(Base):
+    __tablename__ = "stats_watermarks"
+
+    name = Column(String(64), primary_key=True)
+    # Todo lo creado hasta este instante (incluido) ya está en los rollups
+    value = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<StatsWatermark name={self.name} value={self.value}>"
@@ -10,6 +10,8 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
+    # Mantenido por item_service en la misma transacción (ver reconcile_item_counts)
+    item_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships 1 to many 
     items = relationship(
@@ -17,6 +19,11 @@ class User(Base):
         back_populates="owner", 
         cascade="all, delete-orphan"
     )
+    refresh_tokens = relationship(
+        "RefreshToken", 
+        back_populates="user", 
+        cascade="all, delete-orphan"
+    )
 
     def __repr__(self):
         return f"<User id={self.id} email={self.email} is_active={self.is_active}>"
\ No newline at end of file
@@ -1,5 +1,5 @@
 from .user import UserBase, UserCreate, UserResponse, UserUpdate
-from .token import Token, TokenData
+from .token import Token, TokenData, RefreshRequest
 
 __all__ = [
     "UserBase",
@@ -8,4 +8,5 @@ __all__ = [
     "UserUpdate",
     "Token",
     "TokenData",
+    "RefreshRequest",
 ]
\ No newline at end of file
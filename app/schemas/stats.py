@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+class DailyItemsStat(BaseModel):
+    """Ítems creados en un día"""
+    day: date
+    items_created: int
+
+    class Config:
+        from_attributes = True
+
+class TopUserStat(BaseModel):
+    """Usuario y su número de ítems"""
+    user_id: int
+    email: str
+    item_count: int
+
+    class Config:
+        from_attributes = True
+
+class ItemsPerDayResponse(BaseModel):
+    """Schema para /admin/stats/items-per-day"""
+    as_of: Optional[datetime] = None  # watermark de los rollups (None = nunca refrescados)
+    days: list[DailyItemsStat]
+
+class TopUsersResponse(BaseModel):
+    """Schema para /admin/stats/top-users"""
+    as_of: Optional[datetime] = None
+    users: list[TopUserStat]
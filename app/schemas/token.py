@@ -1,10 +1,16 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class Token(BaseModel):
     """Schema para respuesta de login"""
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"  # Tipo de token, por defecto "bearer"
 
+class RefreshRequest(BaseModel):
+    """Schema para renovar el access token con un refresh token"""
+    refresh_token: str
+
 class TokenData(BaseModel):
     """Schema para datos dentro del token"""
     email: str | None = None
\ No newline at end of file
@@ -1,4 +1,14 @@
-from .item_service import create_item, get_item, get_user_items, update_item, delete_item
+from .item_service import create_item, get_item, get_user_items, update_item, delete_item, reconcile_item_counts
+from .stats_service import refresh_rollups, get_items_per_day, get_top_users, get_watermark
+from .token_service import (
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
+    revoke_token_family,
+    revoke_access_token,
+    revoke_user_tokens,
+    purge_expired_refresh_tokens,
+)
 
 __all__ = [
     "create_item",
@@ -6,4 +16,16 @@ __all__ = [
     "get_user_items",
     "update_item",
     "delete_item",
+    "reconcile_item_counts",
+    "refresh_rollups",
+    "get_items_per_day",
+    "get_top_users",
+    "get_watermark",
+    "issue_refresh_token",
+    "rotate_refresh_token",
+    "revoke_refresh_token",
+    "revoke_token_family",
+    "revoke_access_token",
+    "revoke_user_tokens",
+    "purge_expired_refresh_tokens",
 ]
\ No newline at end of file
@@ -1,11 +1,15 @@
 # app/services/item_service.py
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.core.tracing import traced
 from app.models.item import Item
+from app.models.user import User
 from app.schemas.item import ItemCreate, ItemUpdate
 
 
+@traced("item_service.create_item")
 def create_item(
     db: Session, 
     item_create: ItemCreate,
@@ -29,11 +33,12 @@ def create_item(
     )
 
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)  # Refrescar para obtener datos generados (como ID)
+    _adjust_item_count(db, owner_id, 1)  # misma transacción que el INSERT
+    db.commit()  # id y fechas ya vienen del RETURNING (eager_defaults)
     return db_item
 
 
+@traced("item_service.get_item")
 def get_item(
     db: Session, 
     item_id: int,
@@ -56,6 +61,7 @@ def get_item(
     ).first()
 
 
+@traced("item_service.get_user_items")
 def get_user_items(
     db: Session,
     owner_id: int,
@@ -79,6 +85,7 @@ def get_user_items(
     ).offset(skip).limit(limit).all()
 
 
+@traced("item_service.update_item")
 def update_item(
     db: Session,
     item_id: int,
@@ -116,10 +123,10 @@ def update_item(
             setattr(db_item, field, value)
     
     db.commit()
-    db.refresh(db_item)
     return db_item
 
 
+@traced("item_service.delete_item")
 def delete_item(
     db: Session,
     item_id: int,
@@ -145,5 +152,55 @@ def delete_item(
         return False
     
     db.delete(db_item)
+    _adjust_item_count(db, owner_id, -1)
+    db.commit()
+    return True
+
+
+def _adjust_item_count(db: Session, owner_id: int, delta: int) -> None:
+    """
+    Suma ``delta`` a users.item_count sin leerlo antes (UPDATE atómico).
+
+    El commit lo hace quien llama, junto con el INSERT/DELETE del ítem.
+    """
+    db.query(User).filter(User.id == owner_id).update(
+        {User.item_count: User.item_count + delta},
+        synchronize_session=False,
+    )
+
+
+def reconcile_item_counts(db: Session, low: int, high: int) -> int:
+    """
+    Corrige users.item_count para los usuarios con id en [low, high).
+
+    Lee primero los contadores y después cuenta los ítems: si entre ambas
+    lecturas se crea o borra un ítem, el UPDATE condicionado al valor leído
+    no encuentra la fila y ese usuario se corrige en la siguiente pasada
+    (nunca se pisa un incremento concurrente).
+
+    Args:
+        db: Sesión de base de datos
+        low: Primer id de usuario del lote (incluido)
+        high: Último id de usuario del lote (excluido)
+
+    Returns:
+        Número de usuarios corregidos
+    """
+    stored = db.query(User.id, User.item_count).filter(User.id >= low, User.id < high).all()
+    actual = dict(
+        db.query(Item.owner_id, func.count(Item.id))
+        .filter(Item.owner_id >= low, Item.owner_id < high)
+        .group_by(Item.owner_id)
+        .all()
+    )
+
+    fixed = 0
+    for user_id, count in stored:
+        real = actual.get(user_id, 0)
+        if count != real:
+            fixed += db.query(User).filter(User.id == user_id, User.item_count == count).update(
+                {User.item_count: real},
+                synchronize_session=False,
+            )
     db.commit()
-    return True
\ No newline at end of file
+    return fixed
\ No newline at end of file
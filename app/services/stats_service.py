@@ -0,0 +1,158 @@
+# app/services/stats_service.py
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import Date, delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+
+from app.core.tracing import traced
+from app.models.item import Item
+from app.models.stats import ItemDailyStats, StatsWatermark, UserItemStats
+from app.models.user import User
+
+WATERMARK = "items.created_at"
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite devuelve datetimes naive aunque la columna sea timezone=True
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _insert(db: Session):
+    # INSERT ... ON CONFLICT: misma API en ambos dialectos
+    return sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+
+
+def refresh_rollups(
+    db: Session,
+    lag: timedelta,
+    full: bool = False
+) -> Tuple[datetime, int, int]:
+    """
+    Lleva los rollups hasta ``now - lag`` leyendo solo los ítems creados
+    desde la última watermark (rango sobre ix_items_created_at).
+
+    created_at es el now() de la transacción que insertó el ítem, así que
+    una transacción puede hacerse visible después de que su created_at haya
+    quedado por debajo de la watermark: ``lag`` debe superar la transacción
+    de escritura más larga. Los borrados no mueven la watermark; las
+    cuentas de usuarios que solo han borrado se corrigen con ``full=True``.
+
+    Args:
+        db (Session): Sesión de base de datos
+        lag (timedelta): Margen para transacciones aún sin commit
+        full (bool): Vacía los rollups y los recalcula desde el principio
+
+    Returns:
+        Tuple[datetime, int, int]: (nueva watermark, días actualizados, usuarios actualizados)
+    """
+    insert = _insert(db)
+    # La primera vez dos refrescos concurrentes pueden crear la fila a la vez:
+    # ON CONFLICT DO NOTHING en lugar de un INSERT que falla por la PK
+    db.execute(insert(StatsWatermark).values(name=WATERMARK, value=EPOCH).on_conflict_do_nothing(
+        index_elements=[StatsWatermark.name],
+    ))
+    # FOR UPDATE: dos refrescos concurrentes no suman dos veces el mismo rango
+    watermark = db.query(StatsWatermark).filter(
+        StatsWatermark.name == WATERMARK
+    ).with_for_update().one()
+
+    if full:
+        db.execute(delete(ItemDailyStats))
+        db.execute(delete(UserItemStats))
+        watermark.value = EPOCH
+
+    low = _utc(watermark.value)
+    high = datetime.now(timezone.utc) - lag
+    if high <= low:
+        db.rollback()
+        return low, 0, 0
+    in_range = (Item.created_at > low, Item.created_at <= high)
+
+    # 1. Ítems creados por día (solo se suman los del rango nuevo)
+    day = func.date(Item.created_at, type_=Date)
+    days = db.query(day, func.count(Item.id)).filter(*in_range).group_by(day).all()
+    if days:
+        stmt = insert(ItemDailyStats).values([
+            {"day": d, "items_created": n} for d, n in days
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[ItemDailyStats.day],
+            set_={"items_created": ItemDailyStats.items_created + stmt.excluded.items_created},
+        ))
+
+    # 2. Contador de los usuarios con ítems nuevos (users.item_count, ver item_service)
+    if full:
+        owners = select(User.id, User.item_count).where(User.item_count > 0)
+    else:
+        touched = select(Item.owner_id).where(*in_range).distinct()
+        owners = select(User.id, User.item_count).where(User.id.in_(touched))
+    stmt = insert(UserItemStats).from_select(["user_id", "item_count"], owners)
+    # RETURNING: con psycopg el rowcount de un INSERT ... SELECT llega como -1
+    users = sum(1 for _ in db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserItemStats.user_id],
+        set_={"item_count": stmt.excluded.item_count},
+    ).returning(UserItemStats.user_id)))
+
+    watermark.value = high
+    db.commit()
+    return high, len(days), users
+
+
+@traced("stats_service.get_watermark")
+def get_watermark(db: Session) -> Optional[datetime]:
+    """
+    Instante hasta el que están actualizados los rollups
+
+    Returns:
+        Optional[datetime]: La watermark, o None si nunca se han refrescado
+    """
+    value = db.query(StatsWatermark.value).filter(
+        StatsWatermark.name == WATERMARK
+    ).scalar()
+    if value is None or _utc(value) == EPOCH:
+        return None
+    return _utc(value)
+
+
+@traced("stats_service.get_items_per_day")
+def get_items_per_day(
+    db: Session,
+    days: int = 30
+) -> List[ItemDailyStats]:
+    """
+    Ítems creados por día en los últimos ``days`` días (desde el rollup)
+
+    Args:
+        db (Session): Sesión de base de datos
+        days (int): Número de días hacia atrás
+
+    Returns:
+        List[ItemDailyStats]: Un registro por día con ítems, en orden cronológico
+    """
+    since = date.today() - timedelta(days=days - 1)
+    return db.query(ItemDailyStats).filter(
+        ItemDailyStats.day >= since
+    ).order_by(ItemDailyStats.day).all()
+
+
+@traced("stats_service.get_top_users")
+def get_top_users(
+    db: Session,
+    limit: int = 10
+) -> List[Tuple[int, str, int]]:
+    """
+    Usuarios con más ítems (desde el rollup, por ix_stats_user_items_item_count)
+
+    Args:
+        db (Session): Sesión de base de datos
+        limit (int): Número de usuarios
+
+    Returns:
+        List[Tuple[int, str, int]]: (user_id, email, item_count) de mayor a menor
+    """
+    return db.query(UserItemStats.user_id, User.email, UserItemStats.item_count).join(
+        User, User.id == UserItemStats.user_id
+    ).order_by(UserItemStats.item_count.desc()).limit(limit).all()
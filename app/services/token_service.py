@@ -0,0 +1,225 @@
+# app/services/token_service.py
+import secrets
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, joinedload
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.core.revocation import revocations
+from app.core.security import generate_refresh_token, hash_refresh_token
+from app.models.refresh_token import RefreshToken
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite devuelve datetimes naive aunque la columna sea timezone=True
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def issue_refresh_token(
+    db: Session,
+    user_id: int,
+    family_id: Optional[str] = None
+) -> str:
+    """
+    Crea un refresh token para el usuario (sin hacer commit)
+
+    Args:
+        db (Session): Sesión de base de datos
+        user_id (int): ID del usuario
+        family_id (str, optional): Familia a la que pertenece; nueva si es None (login)
+
+    Returns:
+        str: El refresh token en claro (solo se guarda su hash)
+    """
+    token = generate_refresh_token()
+    db.add(RefreshToken(
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        user_id=user_id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token
+
+
+def revoke_token_family(
+    db: Session,
+    family_id: str
+) -> int:
+    """
+    Revoca todos los refresh tokens activos de una familia (sin hacer commit)
+
+    Args:
+        db (Session): Sesión de base de datos
+        family_id (str): Familia a revocar
+
+    Returns:
+        int: Número de tokens revocados
+    """
+    return db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.now(timezone.utc)}, synchronize_session=False)
+
+
+def rotate_refresh_token(
+    db: Session,
+    token: str
+) -> Optional[Tuple[User, str]]:
+    """
+    Canjea un refresh token por uno nuevo de la misma familia
+
+    Una sola búsqueda por índice (token_hash) trae el token y su usuario.
+    Si el token ya había sido rotado o revocado se considera reutilizado
+    (posible robo): se revoca toda la familia.
+
+    Args:
+        db (Session): Sesión de base de datos
+        token (str): Refresh token presentado por el cliente
+
+    Returns:
+        Optional[Tuple[User, str]]: (usuario, nuevo refresh token) o None si no es válido
+    """
+    db_token = db.query(RefreshToken).options(joinedload(RefreshToken.user)).filter(
+        RefreshToken.token_hash == hash_refresh_token(token)
+    ).first()
+
+    if not db_token:
+        return None
+
+    now = datetime.now(timezone.utc)
+    if db_token.revoked_at is not None:
+        revoke_token_family(db, db_token.family_id)
+        db.commit()
+        return None
+
+    if _utc(db_token.expires_at) <= now:
+        return None
+
+    # UPDATE condicional: si dos peticiones canjean el mismo token a la vez, solo una gana
+    rotated = db.query(RefreshToken).filter(
+        RefreshToken.id == db_token.id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+
+    if not rotated:
+        revoke_token_family(db, db_token.family_id)
+        db.commit()
+        return None
+
+    new_token = issue_refresh_token(db, db_token.user_id, family_id=db_token.family_id)
+    # Fuera de la sesión el commit no expira el usuario: sin SELECT extra al leerlo
+    user = db_token.user
+    db.expunge(user)
+    db.commit()
+    return user, new_token
+
+
+def revoke_refresh_token(
+    db: Session,
+    token: str
+) -> bool:
+    """
+    Revoca la familia completa de un refresh token (cierre de sesión del dispositivo)
+
+    Args:
+        db (Session): Sesión de base de datos
+        token (str): Refresh token presentado por el cliente
+
+    Returns:
+        bool: True si el token existía, False en caso contrario
+    """
+    family_id = db.query(RefreshToken.family_id).filter(
+        RefreshToken.token_hash == hash_refresh_token(token)
+    ).scalar()
+
+    if family_id is None:
+        return False
+
+    revoke_token_family(db, family_id)
+    db.commit()
+    return True
+
+
+def revoke_access_token(
+    db: Session,
+    jti: str,
+    user_id: int,
+    expires_at: datetime
+) -> None:
+    """
+    Revoca un access token (logout)
+
+    Se aplica al instante en este worker y en los demás tras su siguiente
+    refresco (ver app/core/revocation.py).
+
+    Args:
+        db (Session): Sesión de base de datos
+        jti (str): Claim jti del token
+        user_id (int): Usuario del token
+        expires_at (datetime): Claim exp del token (después ya no hace falta recordarlo)
+    """
+    db.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+    db.commit()
+    revocations.add_token(jti, expires_at.timestamp())
+
+
+def revoke_user_tokens(
+    db: Session,
+    user_id: int
+) -> int:
+    """
+    Revoca todos los access tokens emitidos hasta ahora para un usuario y
+    todos sus refresh tokens (revocación de administración)
+
+    Args:
+        db (Session): Sesión de base de datos
+        user_id (int): Usuario afectado
+
+    Returns:
+        int: Número de refresh tokens revocados
+    """
+    now = datetime.now(timezone.utc)
+    db.add(RevokedToken(
+        user_id=user_id,
+        expires_at=now + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES),
+        revoked_at=now
+    ))
+    revoked = db.query(RefreshToken).filter(
+        RefreshToken.user_id == user_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+    db.commit()
+    revocations.add_user(user_id, now.timestamp())
+    return revoked
+
+
+def purge_expired_refresh_tokens(
+    db: Session,
+    batch_size: int
+) -> int:
+    """
+    Borra un lote de refresh tokens caducados (con commit)
+
+    Los rotados y revocados se conservan hasta que caducan: mientras tanto
+    sirven para detectar la reutilización. Un token caducado ya no se acepta,
+    así que su fila no aporta nada.
+
+    Args:
+        db (Session): Sesión de base de datos
+        batch_size (int): Máximo de filas a borrar (por ix_refresh_tokens_expires_at)
+
+    Returns:
+        int: Número de tokens borrados
+    """
+    expired = select(RefreshToken.id).where(
+        RefreshToken.expires_at < datetime.now(timezone.utc)
+    ).limit(batch_size)
+    deleted = db.execute(
+        delete(RefreshToken).where(RefreshToken.id.in_(expired)),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    return deleted
@@ -0,0 +1,211 @@
+# app/tools/bench_pool.py
+"""
+Round trips a la BD por petición y tamaño de pool necesario por worker.
+
+Ejecuta la API en proceso (TestClient, contra la BD de settings) y cuenta
+con eventos del engine lo que cuesta cada petición:
+- sentencias SQL, BEGIN/COMMIT/ROLLBACK y resets al devolver la conexión
+- pings de pool_pre_ping (uno por checkout si DB_POOL_PRE_PING=true)
+- checkouts y tiempo con la conexión prestada (incluye la serialización
+  si la conexión no se ha liberado antes)
+
+Después lanza carga concurrente en este proceso, que equivale a un worker
+(80% GET /items/, 20% POST /items/), y estima el pool necesario: el pico de
+conexiones prestadas y, por la ley de Little, checkouts/s × tiempo medio de
+préstamo.
+
+Uso:
+    python -m app.tools.bench_pool --samples 200 --requests 5000 --concurrency 16
+    python -m app.tools.bench_pool --compare      # con y sin pool_pre_ping
+"""
+import argparse
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+COUNTERS = ("stmt", "begin", "commit", "rollback", "reset", "ping")
+
+
+class PoolProbe:
+    """Cuenta round trips y préstamos de conexión con eventos del engine"""
+
+    def __init__(self, engine):
+        self.lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self.hold_seconds = 0.0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.pre_ping = settings.DB_POOL_PRE_PING
+
+        event.listen(engine, "before_cursor_execute", lambda *a: self._inc("stmt"))
+        event.listen(engine, "begin", lambda conn: self._inc("begin"))
+        event.listen(engine, "commit", lambda conn: self._inc("commit"))
+        event.listen(engine, "rollback", lambda conn: self._inc("rollback"))
+        event.listen(engine.pool, "checkout", self._checkout)
+        event.listen(engine.pool, "checkin", self._checkin)
+        event.listen(engine.pool, "reset", self._reset)
+
+    def _inc(self, name: str) -> None:
+        with self.lock:
+            self.counts[name] += 1
+
+    def _checkout(self, dbapi_connection, record, proxy) -> None:
+        with self.lock:
+            self.counts["checkout"] += 1
+            if self.pre_ping:
+                self.counts["ping"] += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+        record.info["bench_checkout"] = time.perf_counter()
+
+    def _checkin(self, dbapi_connection, record) -> None:
+        started = record.info.pop("bench_checkout", None)
+        with self.lock:
+            self.in_use -= 1
+            if started is not None:
+                self.hold_seconds += time.perf_counter() - started
+
+    def _reset(self, dbapi_connection, record, reset_state) -> None:
+        # Si la Connection ya cerró la transacción, el pool no envía otro ROLLBACK
+        if not reset_state.transaction_was_reset:
+            self._inc("reset")
+
+    def snapshot(self) -> Tuple[Counter, float]:
+        with self.lock:
+            return Counter(self.counts), self.hold_seconds
+
+    def reset_peak(self) -> None:
+        with self.lock:
+            self.peak_in_use = self.in_use
+
+
+def _setup(client) -> int:
+    """Registra un usuario de benchmark, deja el token en el cliente y devuelve un item_id"""
+    credentials = {"email": f"bench-pool-{time.time_ns()}@bench.example.com", "password": "bench-password"}
+    client.post("/api/v1/auth/register", json=credentials).raise_for_status()
+    token = client.post("/api/v1/auth/login", json=credentials).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    item_id = None
+    for n in range(20):
+        response = client.post("/api/v1/items/", json={"title": f"bench {n}"})
+        response.raise_for_status()
+        item_id = response.json()["id"]
+    return item_id
+
+
+def _scenarios(item_id: int) -> List[Tuple[str, Callable]]:
+    return [
+        ("GET /users/me", lambda c: c.get("/api/v1/users/me")),
+        ("GET /items/", lambda c: c.get("/api/v1/items/")),
+        ("GET /items/{id}", lambda c: c.get(f"/api/v1/items/{item_id}")),
+        ("POST /items/", lambda c: c.post("/api/v1/items/", json={"title": "bench"})),
+        ("PUT /items/{id}", lambda c: c.put(f"/api/v1/items/{item_id}", json={"title": "bench"})),
+    ]
+
+
+def round_trips(client, probe: PoolProbe, item_id: int, samples: int) -> None:
+    """Coste medio en la BD de cada petición, ejecutadas una a una"""
+    print(f"{'request':<18}" + "".join(f"{name:>9}" for name in COUNTERS)
+          + f"{'total':>9}{'checkout':>10}{'hold ms':>10}")
+    for name, request in _scenarios(item_id):
+        request(client).raise_for_status()  # calentamiento
+        before, hold_before = probe.snapshot()
+        for _ in range(samples):
+            request(client).raise_for_status()
+        after, hold_after = probe.snapshot()
+        delta = {key: (after[key] - before[key]) / samples for key in (*COUNTERS, "checkout")}
+        total = sum(delta[key] for key in COUNTERS)
+        hold_ms = (hold_after - hold_before) / max(after["checkout"] - before["checkout"], 1) * 1000
+        print(f"{name:<18}" + "".join(f"{delta[key]:>9.2f}" for key in COUNTERS)
+              + f"{total:>9.2f}{delta['checkout']:>10.2f}{hold_ms:>10.2f}")
+
+
+def pool_sizing(app, probe: PoolProbe, requests: int, concurrency: int) -> None:
+    """Carga concurrente en un worker y pool necesario para sostenerla"""
+    from fastapi.testclient import TestClient
+
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+
+    def worker() -> None:
+        with TestClient(app) as client:
+            _setup(client)
+            while True:
+                with lock:
+                    n = next(remaining, None)
+                if n is None:
+                    return
+                if random.random() < 0.2:
+                    client.post("/api/v1/items/", json={"title": f"bench {n}"}).raise_for_status()
+                else:
+                    client.get("/api/v1/items/").raise_for_status()
+
+    before, hold_before = probe.snapshot()
+    probe.reset_peak()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    after, hold_after = probe.snapshot()
+
+    checkouts = after["checkout"] - before["checkout"]
+    mean_hold = (hold_after - hold_before) / max(checkouts, 1)
+    # Ley de Little: conexiones en uso = tasa de checkouts × tiempo medio de préstamo
+    in_use = checkouts / elapsed * mean_hold
+    print(f"\nconcurrency={concurrency}  requests={requests}  {requests / elapsed:,.0f} req/s")
+    print(f"checkouts/s={checkouts / elapsed:,.0f}  mean hold={mean_hold * 1000:.2f}ms")
+    print(f"connections in use: mean={in_use:.1f} (Little)  peak={probe.peak_in_use}")
+    print(f"=> DB_POOL_SIZE={max(math.ceil(in_use), 1)}  DB_MAX_OVERFLOW={max(probe.peak_in_use - math.ceil(in_use), 0)}"
+          f"  (actual {settings.DB_POOL_SIZE}/{settings.DB_MAX_OVERFLOW}; por worker)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=200, help="Peticiones por escenario (una a una)")
+    parser.add_argument("--requests", type=int, default=5000, help="Peticiones de la carga concurrente")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--compare", action="store_true", help="Ejecuta con y sin pool_pre_ping")
+    args = parser.parse_args(argv)
+
+    if settings.ENVIRONMENT == "production":
+        parser.error("no se ejecuta en producción")
+
+    if args.compare:
+        forwarded = [a for a in (argv if argv is not None else sys.argv[1:]) if a != "--compare"]
+        for pre_ping in ("true", "false"):
+            print(f"\n=== DB_POOL_PRE_PING={pre_ping} ===", flush=True)
+            subprocess.run(
+                [sys.executable, "-m", "app.tools.bench_pool", *forwarded],
+                env={**os.environ, "DB_POOL_PRE_PING": pre_ping, "DEBUG": "false"},
+                check=True,
+            )
+        return 0
+
+    # El engine se crea al importar la aplicación, con la configuración de este proceso
+    from fastapi.testclient import TestClient
+    from app.core.database import engine
+    from app.main import app
+
+    probe = PoolProbe(engine)
+    with TestClient(app) as client:
+        item_id = _setup(client)
+        round_trips(client, probe, item_id, args.samples)
+    pool_sizing(app, probe, args.requests, args.concurrency)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
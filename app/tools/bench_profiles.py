@@ -0,0 +1,167 @@
+# app/tools/bench_profiles.py
+"""
+Benchmark de perfiles de base de datos (PostgreSQL vs SQLite embebido).
+
+Para cada perfil aplica las migraciones, arranca la API con uvicorn como
+subproceso, lanza carga concurrente (80% GET /items/, 20% POST /items/) y
+mide:
+- throughput (req/s) y latencias p50/p99
+- memoria pico (PSS) de la API y de los procesos del servidor de BD
+  (``--db-process-name``, p.ej. "postgres"; en SQLite la BD va dentro de la API)
+
+Uso:
+    python -m app.tools.bench_profiles --profiles sqlite,postgresql --requests 5000 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+def _memory_kb(pid: int) -> int:
+    """PSS del proceso (reparte la memoria compartida); VmRSS si no hay smaps_rollup"""
+    try:
+        for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _pids_named(name: str) -> List[int]:
+    pids = []
+    for entry in Path("/proc").iterdir():
+        if entry.name.isdigit():
+            try:
+                if (entry / "comm").read_text().strip() == name:
+                    pids.append(int(entry.name))
+            except OSError:
+                continue
+    return pids
+
+
+class MemorySampler(threading.Thread):
+    """Registra la memoria pico de la API y de la BD cada 100 ms"""
+
+    def __init__(self, api_pid: int, db_process_name: Optional[str]):
+        super().__init__(daemon=True)
+        self.api_pid = api_pid
+        self.db_process_name = db_process_name
+        self.peak_api_kb = 0
+        self.peak_db_kb = 0
+        self.finished = threading.Event()
+
+    def run(self) -> None:
+        while not self.finished.wait(0.1):
+            self.peak_api_kb = max(self.peak_api_kb, _memory_kb(self.api_pid))
+            if self.db_process_name:
+                db_kb = sum(_memory_kb(pid) for pid in _pids_named(self.db_process_name))
+                self.peak_db_kb = max(self.peak_db_kb, db_kb)
+
+
+async def _load(base_url: str, requests: int, concurrency: int) -> List[float]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        email = f"bench-{time.time_ns()}@bench.example.com"
+        credentials = {"email": email, "password": "bench-password"}
+        (await client.post("/api/v1/auth/register", json=credentials)).raise_for_status()
+        token = (await client.post("/api/v1/auth/login", json=credentials)).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        latencies: List[float] = []
+        remaining = iter(range(requests))
+
+        async def worker() -> None:
+            for n in remaining:
+                started = time.perf_counter()
+                if random.random() < 0.2:
+                    response = await client.post("/api/v1/items/", json={"title": f"bench {n}"})
+                else:
+                    response = await client.get("/api/v1/items/")
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies
+
+
+def run_profile(profile: str, args) -> Dict[str, float]:
+    env = {**os.environ, "DB_ENGINE": profile, "DEBUG": "false"}
+    subprocess.run(["alembic", "upgrade", "head"], env=env, check=True)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"{base_url}/health").raise_for_status()
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+
+        idle_kb = _memory_kb(server.pid)
+        sampler = MemorySampler(server.pid, args.db_process_name if profile == "postgresql" else None)
+        sampler.start()
+        started = time.perf_counter()
+        latencies = asyncio.run(_load(base_url, args.requests, args.concurrency))
+        elapsed = time.perf_counter() - started
+        sampler.finished.set()
+        sampler.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    return {
+        "req/s": len(latencies) / elapsed,
+        "p50 ms": statistics.median(latencies) * 1000,
+        "p99 ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "api idle MiB": idle_kb / 1024,
+        "api peak MiB": sampler.peak_api_kb / 1024,
+        "db peak MiB": sampler.peak_db_kb / 1024,
+        "total peak MiB": (sampler.peak_api_kb + sampler.peak_db_kb) / 1024,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default="sqlite,postgresql")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db-process-name", default="postgres")
+    args = parser.parse_args(argv)
+
+    if settings.ENVIRONMENT == "production":
+        parser.error("no se ejecuta en producción")
+
+    results = {profile: run_profile(profile, args) for profile in args.profiles.split(",")}
+
+    profiles = list(results)
+    print(f"{'':<16}" + "".join(f"{p:>14}" for p in profiles))
+    for metric in next(iter(results.values())):
+        print(f"{metric:<16}" + "".join(f"{results[p][metric]:>14.1f}" for p in profiles))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# app/tools/calibrate_hash.py
+"""
+Calibra el coste de bcrypt (BCRYPT_ROUNDS) para el hardware actual.
+
+Mide el tiempo de hash en este host para cada número de rounds y propone
+el mayor coste cuya mediana no supera ``--target-ms``. Los hashes
+existentes se migran solos: en cada login correcto, si el hash no usa
+BCRYPT_ROUNDS se regenera (ver verify_and_update_password).
+
+Uso:
+    python -m app.tools.calibrate_hash --target-ms 50
+    python -m app.tools.calibrate_hash --report   # reparto de costes en la tabla users
+"""
+import argparse
+import statistics
+import sys
+import time
+from typing import List, Optional
+
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine, func, select
+
+from app.core.config import settings
+from app.core.security import _pre_hash
+from app.models.user import User
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+
+
+def measure_ms(rounds: int, samples: int) -> float:
+    """Mediana en ms de hashear un password (con el pre-hash SHA-256) a ``rounds``"""
+    handler = bcrypt.using(rounds=rounds)
+    secret = _pre_hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(secret)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def report(database_url: str) -> None:
+    """Cuántos usuarios tienen el hash en cada coste (escaneo completo de users)"""
+    # $2b$12$... → los rounds están en las posiciones 5-6
+    rounds = func.substr(User.hashed_password, 5, 2)
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        rows = conn.execute(select(rounds, func.count()).group_by(rounds).order_by(rounds)).all()
+    total = sum(count for _, count in rows) or 1
+    for value, count in rows:
+        marker = "  <- BCRYPT_ROUNDS" if value == f"{settings.BCRYPT_ROUNDS:02d}" else ""
+        print(f"rounds={value}  users={count:>10}  {100 * count / total:5.1f}%{marker}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--report", action="store_true")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    args = parser.parse_args(argv)
+
+    if args.report:
+        report(args.database_url)
+        return 0
+
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure_ms(rounds, args.samples)
+        print(f"rounds={rounds:<3} {elapsed:9.1f} ms")
+        if elapsed > args.target_ms:
+            break
+        chosen = rounds
+
+    print(f"\nBCRYPT_ROUNDS={chosen}  (objetivo {args.target_ms:.0f} ms, actual {settings.BCRYPT_ROUNDS})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# app/tools/migration_check.py
+"""
+Comprueba que los helpers de app.core.migrations no bloquean escrituras.
+
+Crea una tabla desechable con ``--rows`` filas y, mientras un hilo escribe
+en ella continuamente (INSERT + UPDATE, una transacción por escritura),
+ejecuta ``create_index_concurrently`` y ``add_column_backfilled`` sobre la
+misma tabla. Falla (exit code 1) si alguna escritura da error o tarda más
+de ``--max-write-latency`` segundos.
+
+Uso:
+    python -m app.tools.migration_check --rows 2000000
+"""
+import argparse
+import sys
+import threading
+import time
+from typing import List, Optional
+
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.core.config import settings
+from app.core.migrations import add_column_backfilled, create_index_concurrently
+
+TABLE = "_migration_check"
+
+
+class Writer(threading.Thread):
+    """Escribe en bucle sobre la tabla y registra la latencia de cada escritura"""
+
+    def __init__(self, engine: sa.engine.Engine):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.stop = threading.Event()
+        self.latencies: List[float] = []
+        self.errors: List[str] = []
+
+    def run(self) -> None:
+        insert = sa.text(f"INSERT INTO {TABLE} (payload) VALUES ('write') RETURNING id")
+        update = sa.text(f"UPDATE {TABLE} SET payload = 'updated' WHERE id = :id")
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            try:
+                with self.engine.begin() as conn:
+                    new_id = conn.execute(insert).scalar_one()
+                    conn.execute(update, {"id": new_id // 2 or 1})
+            except Exception as exc:  # se informa al final, el bucle sigue
+                self.errors.append(str(exc))
+            self.latencies.append(time.perf_counter() - started)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--max-write-latency", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    engine = sa.create_engine(args.database_url)
+    with engine.begin() as conn:
+        conn.execute(sa.text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.execute(sa.text(f"CREATE TABLE {TABLE} (id serial PRIMARY KEY, payload text)"))
+        conn.execute(
+            sa.text(f"INSERT INTO {TABLE} (payload) SELECT 'row ' || g FROM generate_series(1, :n) g"),
+            {"n": args.rows},
+        )
+
+    writer = Writer(engine)
+    writer.start()
+    started = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            context = MigrationContext.configure(conn)
+            with context.begin_transaction(), Operations.context(context):
+                create_index_concurrently(f"ix_{TABLE}_payload", TABLE, ["payload"])
+                add_column_backfilled(
+                    TABLE,
+                    sa.Column("flag", sa.Boolean(), server_default=sa.text("false"), nullable=False),
+                )
+    finally:
+        writer.stop.set()
+        writer.join()
+        with engine.begin() as conn:
+            conn.execute(sa.text(f"DROP TABLE IF EXISTS {TABLE}"))
+
+    latencies = sorted(writer.latencies)
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+    worst = latencies[-1] if latencies else 0.0
+    print(f"migration:   {time.perf_counter() - started:.1f}s")
+    print(f"writes:      {len(latencies)} ({len(writer.errors)} errors)")
+    print(f"latency p99: {p99 * 1000:.1f}ms  max: {worst * 1000:.1f}ms")
+
+    for error in writer.errors[:5]:
+        print(f"FAIL {error}")
+    if worst > args.max_write_latency:
+        print(f"FAIL write blocked for {worst:.2f}s > {args.max_write_latency}s")
+    return 1 if writer.errors or worst > args.max_write_latency else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# app/tools/partition_items.py
+"""
+Migración online de ``items`` a la tabla particionada por HASH(owner_id).
+
+Requiere haber aplicado la revisión e3a8b5d04f17 (crea ``items_partitioned``
+y el trigger de réplica). Este comando:
+1. copia las filas existentes por lotes de id, con pausas entre lotes
+2. elimina de la copia las filas borradas durante la copia
+3. hace el swap en una transacción corta (``--no-swap`` para dejarlo para después)
+
+Uso:
+    python -m app.tools.partition_items
+    python -m app.tools.partition_items --drop-old      # tras validar en producción
+    python -m app.tools.partition_items --bench 2000    # latencias de las consultas de item_service
+
+Para el benchmark a 100M filas: sembrar con
+``python -m app.tools.seed --users 5000000 --items 100000000`` y ejecutar
+``--bench 2000 --record before`` antes del swap y ``--record after``
+después; los resultados quedan en partition_bench.json.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core import partitioning
+from app.core.config import settings
+
+BENCH_FILE = Path(__file__).with_name("partition_bench.json")
+
+
+def _batched(engine: Engine, step: Callable[[Connection, int, int], int], label: str,
+             batch_size: int, pause: float) -> int:
+    """Ejecuta ``step`` por rangos de id, un commit por lote, informando del progreso"""
+    with engine.connect() as conn:
+        low, high = conn.execute(text("SELECT min(id), max(id) FROM items")).first()
+    if low is None:
+        return 0
+
+    total = 0
+    started = last_report = time.perf_counter()
+    for lo in range(low, high + 1, batch_size):
+        with engine.begin() as conn:
+            total += step(conn, lo, lo + batch_size)
+        now = time.perf_counter()
+        if now - last_report >= 10 or lo + batch_size > high:
+            pct = min(100.0, 100.0 * (lo + batch_size - low) / (high - low + 1))
+            print(f"{label}: {pct:5.1f}%  {total:,} rows  {total / (now - started):,.0f} rows/s")
+            last_report = now
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def bench(engine: Engine, samples: int) -> Dict[str, Dict[str, float]]:
+    """
+    Latencia de las sentencias de item_service para owners aleatorios.
+
+    Las escrituras (update_item/delete_item) se deshacen con un rollback.
+
+    Returns:
+        {consulta: {"p50_ms", "p99_ms", "max_ms"}}
+    """
+    queries = {
+        "get_user_items": ("SELECT * FROM items WHERE owner_id = :owner LIMIT 50 OFFSET 0", False),
+        "get_item": ("SELECT * FROM items WHERE id = :item AND owner_id = :owner", False),
+        # Mismas sentencias que emite el flush con la PK (id, owner_id) del modelo
+        "update_item": ("UPDATE items SET title = 'bench', updated_at = now() "
+                        "WHERE id = :item AND owner_id = :owner", True),
+        "delete_item": ("DELETE FROM items WHERE id = :item AND owner_id = :owner", True),
+    }
+    results: Dict[str, Dict[str, float]] = {}
+    with engine.connect() as conn:
+        max_owner = conn.execute(text("SELECT max(id) FROM users")).scalar() or 1
+        owners = [random.randint(1, max_owner) for _ in range(samples)]
+        pairs = conn.execute(
+            text("SELECT id, owner_id FROM items WHERE owner_id = ANY(:owners)"), {"owners": owners}
+        ).all() or [(0, owner) for owner in owners]
+        conn.rollback()
+
+        for name, (sql, write) in queries.items():
+            timings = []
+            for _ in range(samples):
+                item, owner = random.choice(pairs)
+                started = time.perf_counter()
+                result = conn.execute(text(sql), {"owner": owner, "item": item})
+                if not write:
+                    result.all()
+                timings.append((time.perf_counter() - started) * 1000)
+                conn.rollback()
+            timings.sort()
+            results[name] = {
+                "p50_ms": round(statistics.median(timings), 3),
+                "p99_ms": round(timings[int(len(timings) * 0.99)], 3),
+                "max_ms": round(timings[-1], 3),
+            }
+            print(f"{name:<16} p50={results[name]['p50_ms']:7.3f}ms  "
+                  f"p99={results[name]['p99_ms']:7.3f}ms  max={results[name]['max_ms']:7.3f}ms")
+    return results
+
+
+def record(path: Path, label: str, engine: Engine, results: Dict[str, Dict[str, float]]) -> None:
+    """Guarda los resultados de ``--bench`` bajo ``label`` (p.ej. "before"/"after")"""
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT count(*) FROM items")).scalar()
+        partitioned = partitioning.is_partitioned(conn)
+    recorded = json.loads(path.read_text()) if path.exists() else {}
+    recorded[label] = {"rows": rows, "partitioned": partitioned, "queries": results}
+    path.write_text(json.dumps(recorded, indent=2, sort_keys=True) + "\n")
+    print(f"recorded {label} in {path}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--batch-size", type=int, default=settings.MIGRATION_BACKFILL_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.MIGRATION_BACKFILL_PAUSE_SECONDS)
+    parser.add_argument("--no-swap", action="store_true")
+    parser.add_argument("--drop-old", action="store_true", help="Elimina items_unpartitioned")
+    parser.add_argument("--bench", type=int, metavar="SAMPLES")
+    parser.add_argument("--record", metavar="LABEL",
+                        help=f"Con --bench: guarda los resultados en {BENCH_FILE.name} bajo LABEL")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+
+    if args.bench:
+        results = bench(engine, args.bench)
+        if args.record:
+            record(BENCH_FILE, args.record, engine, results)
+        return 0
+
+    if args.drop_old:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {partitioning.OLD}"))
+        return 0
+
+    with engine.connect() as conn:
+        if partitioning.is_partitioned(conn):
+            print("items ya está particionada")
+            return 0
+
+    copied = _batched(engine, partitioning.copy_batch, "copy", args.batch_size, args.pause)
+    removed = _batched(engine, partitioning.reconcile_batch, "reconcile", args.batch_size, args.pause)
+    print(f"copied {copied:,} rows, removed {removed:,} deleted during copy")
+
+    if not args.no_swap:
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            partitioning.swap(conn, settings.MIGRATION_LOCK_TIMEOUT)
+        print(f"swap: {(time.perf_counter() - started) * 1000:.0f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# app/tools/purge_tokens.py
+"""
+Borra los refresh tokens caducados.
+
+Cada login y cada rotación añaden una fila a ``refresh_tokens``; las filas
+rotadas se conservan hasta su caducidad para detectar reutilizaciones (ver
+token_service.rotate_refresh_token). Este job borra las caducadas por lotes
+(ix_refresh_tokens_expires_at), un commit por lote.
+
+Uso:
+    python -m app.tools.purge_tokens                 # una pasada
+    python -m app.tools.purge_tokens --every 3600    # en bucle, como job en segundo plano
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.token_service import purge_expired_refresh_tokens
+
+
+def purge(database_url: str, batch_size: int, pause: float) -> int:
+    """Una pasada completa. Returns: tokens borrados"""
+    engine = create_engine(database_url)
+    purged = 0
+    started = time.perf_counter()
+    with Session(engine) as db:
+        while True:
+            deleted = purge_expired_refresh_tokens(db, batch_size)
+            purged += deleted
+            if deleted < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    engine.dispose()
+    print(f"purge: {purged} refresh tokens deleted in {time.perf_counter() - started:.1f}s")
+    return purged
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--batch-size", type=int, default=settings.MIGRATION_BACKFILL_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.MIGRATION_BACKFILL_PAUSE_SECONDS)
+    parser.add_argument("--every", type=float, metavar="SECONDS",
+                        help="Repite la pasada cada SECONDS segundos")
+    args = parser.parse_args(argv)
+
+    while True:
+        purge(args.database_url, args.batch_size, args.pause)
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+# app/tools/query_plans.py
+"""
+Regresión de planes de consulta con datasets a escala.
+
+Siembra una base de datos PostgreSQL de pruebas a varios tamaños, ejecuta
+las mismas funciones que usa la API (item_service, auth y dependencies)
+capturando cada sentencia SQL que emiten, y pasa cada una por
+``EXPLAIN (ANALYZE, BUFFERS)``.
+
+Falla (exit code 1) si:
+- algún plan hace un ``Seq Scan`` sobre una tabla no trivial
+- una consulta de item_service toca más de una partición de ``items``
+  (si la tabla está particionada por owner_id; salvo CROSS_PARTITION)
+- los buffers o el tiempo superan el presupuesto registrado
+- una consulta no tiene presupuesto registrado en query_plan_budgets.json
+
+Uso:
+    python -m app.tools.query_plans --database-url postgresql+psycopg://.../homebrain_plans
+    python -m app.tools.query_plans --sizes 10000 --record   # registra presupuestos
+
+ATENCIÓN: vacía las tablas ``users`` e ``items`` de la base de datos indicada.
+"""
+import argparse
+import json
+import math
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_user
+from app.api.v1.endpoints.auth import login_user, logout, refresh_access_token, register_user
+from app.core.config import settings
+from app.core.security import create_access_token, hash_password
+from app.models.stats import StatsWatermark
+from app.schemas.item import ItemCreate, ItemUpdate
+from app.schemas.token import RefreshRequest
+from app.schemas.user import UserCreate
+from app.services import item_service, stats_service, token_service
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+ITEMS_PER_USER = 20
+SEED_PASSWORD = "seed-password"
+# Un Seq Scan sobre tablas más pequeñas que esto es legítimo (cabe en pocas páginas)
+SEQ_SCAN_MIN_ROWS = 1_000
+# Margen absoluto al registrar: en consultas de pocas páginas el número de
+# buffers varía entre ejecuciones (plan bitmap vs index, tuplas muertas)
+MIN_BUFFER_HEADROOM = 16
+BUDGETS_FILE = Path(__file__).with_name("query_plan_budgets.json")
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+# Recorren un rango de owner_id por lotes: con HASH(owner_id) tocan todas las particiones
+CROSS_PARTITION = {"item_service.reconcile_item_counts"}
+
+
+class Probe:
+    """Datos del usuario/ítem sobre los que se ejecutan los escenarios"""
+
+    def __init__(self, user_id: int, email: str, item_id: int):
+        self.user_id = user_id
+        self.email = email
+        self.item_id = item_id
+
+
+def _refresh_last_hour(db: Session, probe: Probe) -> object:
+    """Refresco incremental típico: solo la última hora de ítems"""
+    db.merge(StatsWatermark(
+        name=stats_service.WATERMARK, value=datetime.now(timezone.utc) - timedelta(hours=1)
+    ))
+    return stats_service.refresh_rollups(db, lag=timedelta(0))
+
+
+def _scenarios() -> List[Tuple[str, Callable[[Session, Probe], object]]]:
+    """
+    Escenarios que reproducen cada consulta emitida por la API.
+
+    Cada escenario recibe una sesión y el usuario de prueba; las sentencias
+    SQL que emite se capturan y se explican por separado.
+    """
+    def _credentials(probe: Probe) -> HTTPAuthorizationCredentials:
+        token = create_access_token(data={"sub": probe.email})
+        return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    return [
+        ("auth.register_user", lambda db, p: register_user(
+            UserCreate(email="plan-check@seed.example.com", password=SEED_PASSWORD), db)),
+        ("auth.login_user", lambda db, p: login_user(
+            UserCreate(email=p.email, password=SEED_PASSWORD), db)),
+        ("auth.refresh_access_token", lambda db, p: refresh_access_token(
+            RefreshRequest(refresh_token=login_user(
+                UserCreate(email=p.email, password=SEED_PASSWORD), db)["refresh_token"]), db)),
+        ("dependencies.get_current_user", lambda db, p: get_current_user(_credentials(p), db)),
+        ("auth.logout", lambda db, p: logout(
+            None, _credentials(p), get_current_user(_credentials(p), db), db)),
+        ("item_service.create_item", lambda db, p: item_service.create_item(
+            db, ItemCreate(title="plan check"), owner_id=p.user_id)),
+        ("item_service.get_item", lambda db, p: item_service.get_item(
+            db, item_id=p.item_id, owner_id=p.user_id)),
+        ("item_service.get_user_items", lambda db, p: item_service.get_user_items(
+            db, owner_id=p.user_id)),
+        ("item_service.update_item", lambda db, p: item_service.update_item(
+            db, item_id=p.item_id, owner_id=p.user_id, item_update=ItemUpdate(title="updated"))),
+        ("item_service.delete_item", lambda db, p: item_service.delete_item(
+            db, item_id=p.item_id, owner_id=p.user_id)),
+        ("item_service.reconcile_item_counts", lambda db, p: item_service.reconcile_item_counts(
+            db, low=p.user_id, high=p.user_id + 100)),
+        ("token_service.revoke_user_tokens", lambda db, p: token_service.revoke_user_tokens(db, p.user_id)),
+        ("token_service.purge_expired_refresh_tokens", lambda db, p: token_service.purge_expired_refresh_tokens(
+            db, settings.MIGRATION_BACKFILL_BATCH_SIZE)),
+        ("stats_service.refresh_rollups", _refresh_last_hour),
+        ("stats_service.get_items_per_day", lambda db, p: stats_service.get_items_per_day(db)),
+        ("stats_service.get_top_users", lambda db, p: stats_service.get_top_users(db)),
+    ]
+
+
+def seed(engine: Engine, size: int) -> Probe:
+    """
+    Vacía y siembra las tablas con ``size`` ítems repartidos entre usuarios.
+
+    Returns:
+        Probe con un usuario de tamaño típico y uno de sus ítems
+    """
+    n_users = max(size // ITEMS_PER_USER, 1)
+    hashed = hash_password(SEED_PASSWORD)
+
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE items, users RESTART IDENTITY CASCADE"))
+        conn.execute(
+            text(
+                "INSERT INTO users (email, hashed_password, is_active, is_superuser) "
+                "SELECT 'user' || g || '@seed.example.com', :hashed, true, false "
+                "FROM generate_series(1, :n) AS g"
+            ),
+            {"hashed": hashed, "n": n_users},
+        )
+        # created_at determinista (un ítem por minuto hacia atrás, un año): las
+        # sentencias de cada escenario, y con ellas las claves de presupuesto,
+        # no cambian entre ejecuciones
+        conn.execute(
+            text(
+                "INSERT INTO items (title, description, owner_id, created_at, updated_at) "
+                "SELECT 'item ' || g, 'seeded item ' || g, 1 + (g % :n_users), "
+                "now() - (g % 525600) * interval '1 minute', now() "
+                "FROM generate_series(1, :size) AS g"
+            ),
+            {"n_users": n_users, "size": size},
+        )
+        conn.execute(text(
+            "UPDATE users u SET item_count = c.n "
+            "FROM (SELECT owner_id, count(*) AS n FROM items GROUP BY owner_id) c "
+            "WHERE u.id = c.owner_id"
+        ))
+
+    # VACUUM no puede ejecutarse dentro de una transacción
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE users"))
+        conn.execute(text("VACUUM ANALYZE items"))
+
+    with engine.connect() as conn:
+        user_id = max(n_users // 2, 1)
+        item_id = conn.execute(
+            text("SELECT id FROM items WHERE owner_id = :o LIMIT 1"), {"o": user_id}
+        ).scalar_one()
+
+    return Probe(user_id=user_id, email=f"user{user_id}@seed.example.com", item_id=item_id)
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def _relation_sizes(conn: Connection) -> Dict[str, float]:
+    rows = conn.execute(
+        text(
+            "SELECT relname, reltuples FROM pg_class "
+            "WHERE relname IN ('users', 'items') OR relname LIKE 'items\\_p%'"
+        )
+    )
+    return {name: tuples for name, tuples in rows}
+
+
+def explain(conn: Connection, statement: str, parameters) -> dict:
+    """
+    Ejecuta EXPLAIN (ANALYZE, BUFFERS) dentro de un savepoint que se deshace.
+
+    Returns:
+        Diccionario con el plan raíz y los tiempos
+    """
+    savepoint = conn.begin_nested()
+    try:
+        result = conn.exec_driver_sql(
+            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+        ).scalar_one()
+    finally:
+        savepoint.rollback()
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]
+
+
+def run_size(engine: Engine, size: int, budgets: dict, record: bool, headroom: float) -> List[str]:
+    """
+    Siembra un tamaño, captura y explica cada consulta de los escenarios.
+
+    Returns:
+        Lista de fallos encontrados (vacía si todo está dentro de presupuesto)
+    """
+    probe = seed(engine, size)
+    failures: List[str] = []
+    size_budgets = budgets.setdefault(str(size), {})
+
+    for name, scenario in _scenarios():
+        captured: List[Tuple[str, object]] = []
+
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            if not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+                captured.append((statement, parameters))
+
+        with engine.connect() as conn:
+            outer = conn.begin()
+            # Los efectos del escenario se deshacen antes de explicar sus sentencias:
+            # EXPLAIN ANALYZE las vuelve a ejecutar (p.ej. un INSERT con email único)
+            ran = conn.begin_nested()
+            event.listen(conn, "before_cursor_execute", _capture)
+            # Los commit() del servicio se convierten en savepoints de la transacción externa
+            db = Session(bind=conn, join_transaction_mode="create_savepoint")
+            try:
+                scenario(db, probe)
+            finally:
+                event.remove(conn, "before_cursor_execute", _capture)
+                db.close()
+                ran.rollback()
+
+            relation_sizes = _relation_sizes(conn)
+            for index, (statement, parameters) in enumerate(captured):
+                key = f"{name}[{index}]"
+                result = explain(conn, statement, parameters)
+                plan = result["Plan"]
+                buffers = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+                time_ms = result["Execution Time"]
+                print(f"  {key:<40} {plan['Node Type']:<20} buffers={buffers:<8} time={time_ms:.3f}ms")
+
+                partitions = set()
+                for node in _walk(plan):
+                    relation = node.get("Relation Name")
+                    if node["Node Type"] == "Seq Scan" and relation_sizes.get(relation, 0) >= SEQ_SCAN_MIN_ROWS:
+                        failures.append(f"{size} {key}: Seq Scan on {relation}\n    {statement}")
+                    if relation and relation.startswith("items_p") and node.get("Actual Loops", 1) > 0:
+                        partitions.add(relation)
+                if key.startswith("item_service.") and name not in CROSS_PARTITION and len(partitions) > 1:
+                    failures.append(f"{size} {key}: no partition pruning ({len(partitions)} partitions)\n    {statement}")
+
+                if record:
+                    size_budgets[key] = {
+                        "buffers": math.ceil(max(buffers * headroom, buffers + MIN_BUFFER_HEADROOM)),
+                        "time_ms": round(max(time_ms * headroom, 1.0), 3),
+                    }
+                    continue
+
+                budget = size_budgets.get(key)
+                if budget is None:
+                    # Consulta nueva o distinta: hay que registrar su presupuesto (--record)
+                    failures.append(f"{size} {key}: no budget recorded in {BUDGETS_FILE.name}\n    {statement}")
+                    continue
+                if buffers > budget["buffers"]:
+                    failures.append(f"{size} {key}: buffers {buffers} > {budget['buffers']}")
+                if time_ms > budget["time_ms"]:
+                    failures.append(f"{size} {key}: time {time_ms:.3f}ms > {budget['time_ms']}ms")
+            outer.rollback()
+
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Tamaños de items separados por comas")
+    parser.add_argument("--budgets", type=Path, default=BUDGETS_FILE)
+    parser.add_argument("--record", action="store_true",
+                        help="Registra los presupuestos observados en lugar de compararlos")
+    parser.add_argument("--headroom", type=float, default=2.0,
+                        help="Margen multiplicativo al registrar presupuestos")
+    args = parser.parse_args(argv)
+
+    if settings.ENVIRONMENT == "production":
+        parser.error("no se ejecuta en producción: vacía las tablas users e items")
+
+    budgets = json.loads(args.budgets.read_text()) if args.budgets.exists() else {}
+    engine = create_engine(args.database_url)
+    failures: List[str] = []
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"== {size} items")
+        failures.extend(run_size(engine, size, budgets, args.record, args.headroom))
+
+    if args.record:
+        args.budgets.write_text(json.dumps(budgets, indent=2, sort_keys=True) + "\n")
+        print(f"Presupuestos guardados en {args.budgets}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# app/tools/reconcile_counts.py
+"""
+Repara la deriva de users.item_count respecto a los ítems reales.
+
+item_service mantiene el contador en la misma transacción que cada
+INSERT/DELETE, pero cualquier escritura que no pase por el servicio
+(SQL manual, restauraciones parciales, cargas masivas) lo desajusta. Este
+job recorre ``users`` por rangos de id, recuenta con ix_items_owner_id y
+corrige solo los usuarios desajustados (ver reconcile_item_counts).
+
+Uso:
+    python -m app.tools.reconcile_counts                 # una pasada
+    python -m app.tools.reconcile_counts --every 3600    # en bucle, como job en segundo plano
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.item_service import reconcile_item_counts
+
+
+def reconcile(database_url: str, batch_size: int, pause: float) -> int:
+    """Una pasada completa sobre ``users``. Returns: usuarios corregidos"""
+    engine = create_engine(database_url)
+    with Session(engine) as db:
+        low, high = db.query(func.min(User.id), func.max(User.id)).one()
+        if low is None:
+            return 0
+
+        fixed = 0
+        started = time.perf_counter()
+        for lo in range(low, high + 1, batch_size):
+            # Un commit por lote: no se mantienen locks entre lotes
+            fixed += reconcile_item_counts(db, lo, lo + batch_size)
+            if pause:
+                time.sleep(pause)
+    engine.dispose()
+    print(f"reconcile: {fixed} users fixed in {time.perf_counter() - started:.1f}s")
+    return fixed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--batch-size", type=int, default=settings.MIGRATION_BACKFILL_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.MIGRATION_BACKFILL_PAUSE_SECONDS)
+    parser.add_argument("--every", type=float, metavar="SECONDS",
+                        help="Repite la pasada cada SECONDS segundos")
+    args = parser.parse_args(argv)
+
+    while True:
+        reconcile(args.database_url, args.batch_size, args.pause)
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+# app/tools/refresh_stats.py
+"""
+Refresca los rollups de /admin/stats (stats_items_daily, stats_user_items).
+
+Cada pasada lee solo los ítems creados desde la watermark anterior hasta
+``now - --lag`` (ver refresh_rollups), así que es barata y puede ejecutarse
+cada minuto. ``--full`` vacía los rollups y los recalcula leyendo toda la
+tabla ``items``: para la primera carga y, de vez en cuando, para recoger
+los borrados. Escribe en los rollups, así que va contra el primario;
+conviene lanzarlo fuera de horas punta.
+
+Uso:
+    python -m app.tools.refresh_stats --full            # primera carga
+    python -m app.tools.refresh_stats --every 60        # en bucle, como job en segundo plano
+"""
+import argparse
+import sys
+import time
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.stats_service import refresh_rollups
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--lag", type=int, default=settings.STATS_REFRESH_LAG_SECONDS, metavar="SECONDS")
+    parser.add_argument("--full", action="store_true", help="Recalcula los rollups desde cero")
+    parser.add_argument("--every", type=float, metavar="SECONDS",
+                        help="Repite el refresco incremental cada SECONDS segundos")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    full = args.full
+    while True:
+        started = time.perf_counter()
+        with Session(engine) as db:
+            watermark, days, users = refresh_rollups(db, timedelta(seconds=args.lag), full=full)
+        print(f"refresh{' (full)' if full else ''}: watermark={watermark.isoformat()}  "
+              f"days={days}  users={users}  {(time.perf_counter() - started) * 1000:.0f}ms")
+        if not args.every:
+            return 0
+        full = False
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,15 @@
 #!/bin/sh
 set -e
 
-echo "Waiting for Postgres..."
+if [ "$DB_ENGINE" != "sqlite" ]; then
+  echo "Waiting for Postgres..."
 
-while ! nc -z db 5432; do
-  sleep 1
-done
+  while ! nc -z db 5432; do
+    sleep 1
+  done
 
-echo "Postgres is up"
+  echo "Postgres is up"
+fi
 
 echo "Running Alembic migrations..."
 alembic upgrade head
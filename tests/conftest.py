@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.sqlite import configure_sqlite
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def alembic_config() -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    return config
+
+
+@pytest.fixture
+def sqlite_url(tmp_path, monkeypatch) -> str:
+    """SQLite temporal vacío; alembic/env.py toma la URL de settings"""
+    monkeypatch.setattr(settings, "DB_ENGINE", "sqlite")
+    monkeypatch.setattr(settings, "SQLITE_PATH", str(tmp_path / "test.db"))
+    return settings.DATABASE_URL
+
+
+@pytest.fixture
+def db(sqlite_url, alembic_config):
+    """Sesión sobre un SQLite temporal con todas las migraciones aplicadas"""
+    command.upgrade(alembic_config, "head")
+    engine = create_engine(sqlite_url, connect_args={"check_same_thread": False})
+    configure_sqlite(engine)
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+    engine.dispose()
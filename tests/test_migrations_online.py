@@ -0,0 +1,119 @@
+"""
+Migraciones aplicadas con escrituras concurrentes (ver app.core.migrations).
+
+Crea el esquema inicial, siembra ``users`` e ``items`` y, mientras un hilo
+escribe continuamente (INSERT + UPDATE de items, una transacción por
+escritura), ejecuta ``alembic upgrade head``. Falla si alguna escritura da
+error, tarda más de MAX_WRITE_LATENCY o se pierde.
+
+Se ejecuta siempre contra un SQLite temporal; contra PostgreSQL si está
+definida MIGRATIONS_DATABASE_URL.
+
+ATENCIÓN: borra y recrea el esquema ``public`` de MIGRATIONS_DATABASE_URL.
+"""
+import os
+import threading
+import time
+from typing import List
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.sqlite import configure_sqlite
+
+INITIAL_REVISION = "3fcddcf12899"
+USERS = 50
+ITEMS = {"sqlite": 5_000, "postgresql": 200_000}
+# SQLite serializa las escrituras: esperan como mucho busy_timeout
+MAX_WRITE_LATENCY = {"sqlite": settings.SQLITE_BUSY_TIMEOUT_MS / 1000, "postgresql": 1.0}
+
+
+class Writer(threading.Thread):
+    """Escribe en bucle sobre items y registra la latencia de cada escritura"""
+
+    def __init__(self, engine: sa.engine.Engine):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.stop = threading.Event()
+        self.latencies: List[float] = []
+        self.errors: List[str] = []
+        self.inserted = 0
+
+    def run(self) -> None:
+        insert = sa.text(
+            "INSERT INTO items (title, description, owner_id) VALUES ('write', 'concurrent', :owner) RETURNING id"
+        )
+        update = sa.text("UPDATE items SET title = 'updated' WHERE id = :id")
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            try:
+                with self.engine.begin() as conn:
+                    new_id = conn.execute(insert, {"owner": 1 + self.inserted % USERS}).scalar_one()
+                    conn.execute(update, {"id": new_id // 2 or 1})
+                self.inserted += 1
+            except Exception as exc:  # se informa al final, el bucle sigue
+                self.errors.append(str(exc))
+            self.latencies.append(time.perf_counter() - started)
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def database_url(request, monkeypatch) -> str:
+    """URL de una BD vacía; alembic/env.py la toma de settings"""
+    if request.param == "sqlite":
+        return request.getfixturevalue("sqlite_url")
+
+    url = os.environ.get("MIGRATIONS_DATABASE_URL")
+    if not url:
+        pytest.skip("MIGRATIONS_DATABASE_URL no definida")
+    parsed = make_url(url)
+    monkeypatch.setattr(settings, "DB_ENGINE", "postgresql")
+    monkeypatch.setattr(settings, "DB_HOST", parsed.host or "localhost")
+    monkeypatch.setattr(settings, "DB_PORT", parsed.port or 5432)
+    monkeypatch.setattr(settings, "DB_USER", parsed.username or "")
+    monkeypatch.setattr(settings, "DB_PASSWORD", parsed.password or "")
+    monkeypatch.setattr(settings, "DB_NAME", parsed.database)
+    engine = sa.create_engine(settings.DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(sa.text("DROP SCHEMA public CASCADE"))
+        conn.execute(sa.text("CREATE SCHEMA public"))
+    engine.dispose()
+    return settings.DATABASE_URL
+
+
+def test_upgrade_head_with_concurrent_writes(database_url, alembic_config):
+    command.upgrade(alembic_config, INITIAL_REVISION)
+
+    engine = sa.create_engine(database_url)
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        configure_sqlite(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            sa.text("INSERT INTO users (email, hashed_password, is_active, is_superuser) VALUES (:e, 'x', true, false)"),
+            [{"e": f"user{n}@seed.example.com"} for n in range(USERS)],
+        )
+        conn.execute(
+            sa.text("INSERT INTO items (title, description, owner_id) VALUES (:t, 'seeded', :o)"),
+            [{"t": f"item {n}", "o": 1 + n % USERS} for n in range(ITEMS[dialect])],
+        )
+
+    writer = Writer(engine)
+    writer.start()
+    try:
+        command.upgrade(alembic_config, "head")
+        time.sleep(0.2)  # escrituras también después de la última revisión
+    finally:
+        writer.stop.set()
+        writer.join()
+
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text("SELECT count(*) FROM items")).scalar_one()
+    engine.dispose()
+
+    assert not writer.errors, writer.errors[:5]
+    assert writer.inserted > 0
+    assert rows == ITEMS[dialect] + writer.inserted
+    assert max(writer.latencies) < MAX_WRITE_LATENCY[dialect]
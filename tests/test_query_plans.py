@@ -0,0 +1,43 @@
+"""
+Regresión de planes de consulta (app.tools.query_plans).
+
+El test contra la BD necesita una base de datos PostgreSQL de pruebas con
+las migraciones aplicadas, indicada en QUERY_PLANS_DATABASE_URL (si no está
+definida se omite). QUERY_PLANS_SIZES limita los tamaños a comprobar.
+
+ATENCIÓN: vacía las tablas ``users`` e ``items`` de esa base de datos.
+"""
+import json
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.tools import query_plans
+
+DATABASE_URL = os.environ.get("QUERY_PLANS_DATABASE_URL")
+SIZES = [int(s) for s in os.environ.get(
+    "QUERY_PLANS_SIZES", ",".join(str(s) for s in query_plans.DEFAULT_SIZES)
+).split(",")]
+
+
+def _budgets() -> dict:
+    return json.loads(query_plans.BUDGETS_FILE.read_text())
+
+
+@pytest.mark.parametrize("size", query_plans.DEFAULT_SIZES)
+def test_every_scenario_has_a_budget(size):
+    recorded = {key.split("[")[0] for key in _budgets().get(str(size), {})}
+    missing = {name for name, _ in query_plans._scenarios()} - recorded
+    assert not missing, f"sin presupuesto para {size}: {sorted(missing)} (python -m app.tools.query_plans --record)"
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="QUERY_PLANS_DATABASE_URL no definida")
+@pytest.mark.parametrize("size", SIZES)
+def test_query_plans_within_budget(size):
+    engine = create_engine(DATABASE_URL)
+    try:
+        failures = query_plans.run_size(engine, size, _budgets(), record=False, headroom=1.0)
+    finally:
+        engine.dispose()
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,24 @@
+import time
+
+from app.core.revocation import RevocationList
+
+
+def test_user_revocation_uses_whole_second_cutoff():
+    revocations = RevocationList()
+    now = time.time()
+    revocations.add_user(1, now)
+
+    # iat es entero: un token emitido en el mismo segundo sigue siendo válido
+    assert not revocations.is_user_revoked(1, int(now))
+    assert revocations.is_user_revoked(1, int(now) - 1)
+    assert not revocations.is_user_revoked(2, int(now) - 1)
+
+
+def test_token_revocation_until_expiry():
+    revocations = RevocationList()
+    revocations.add_token("live", time.time() + 60)
+    revocations.add_token("expired", time.time() - 1)
+
+    assert revocations.is_token_revoked("live")
+    assert not revocations.is_token_revoked("expired")
+    assert not revocations.is_token_revoked(None)
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.item import Item
+from app.models.stats import StatsWatermark
+from app.models.user import User
+from app.services import stats_service
+
+
+@pytest.fixture(autouse=True)
+def items(db):
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    db.add(User(id=1, email="user@example.com", hashed_password="x", item_count=2))
+    db.add_all([
+        Item(owner_id=1, title=f"item {n}", created_at=yesterday, updated_at=yesterday)
+        for n in (1, 2)
+    ])
+    db.commit()
+
+
+def test_first_refresh_creates_watermark_and_rollups(db):
+    watermark, days, users = stats_service.refresh_rollups(db, lag=timedelta(0))
+
+    assert (days, users) == (1, 1)
+    assert stats_service.get_watermark(db) == watermark
+    assert stats_service.get_top_users(db) == [(1, "user@example.com", 2)]
+
+
+def test_refresh_with_existing_watermark_only_reads_new_items(db):
+    stats_service.refresh_rollups(db, lag=timedelta(0))
+    _, days, users = stats_service.refresh_rollups(db, lag=timedelta(0))
+
+    assert (days, users) == (0, 0)
+    assert db.query(StatsWatermark).count() == 1
+    assert sum(day.items_created for day in stats_service.get_items_per_day(db)) == 2
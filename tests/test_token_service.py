@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services import token_service
+
+
+@pytest.fixture(autouse=True)
+def user(db):
+    db.add(User(id=1, email="user@example.com", hashed_password="x"))
+    db.commit()
+
+
+def _token(n: int, expires_in: timedelta, revoked: bool = False) -> RefreshToken:
+    now = datetime.now(timezone.utc)
+    return RefreshToken(
+        token_hash=f"{n:064x}", family_id="family", user_id=1,
+        expires_at=now + expires_in, revoked_at=now if revoked else None,
+    )
+
+
+def test_purge_deletes_only_expired_tokens_in_batches(db):
+    db.add_all([_token(n, timedelta(days=-1)) for n in range(5)])
+    # Rotado pero sin caducar: se conserva para detectar reutilización
+    db.add_all([_token(10, timedelta(days=1), revoked=True), _token(11, timedelta(days=1))])
+    db.commit()
+
+    assert token_service.purge_expired_refresh_tokens(db, batch_size=3) == 3
+    assert token_service.purge_expired_refresh_tokens(db, batch_size=3) == 2
+    assert token_service.purge_expired_refresh_tokens(db, batch_size=3) == 0
+    assert sorted(t.token_hash for t in db.query(RefreshToken)) == [f"{10:064x}", f"{11:064x}"]